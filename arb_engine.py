@@ -0,0 +1,260 @@
+# arb_engine.py
+#
+# Join-based arbitrage scan.
+# Every bookmaker's tables are normalized once into a quote table:
+#     Player | Stat | K | Odds | Price | Bookmaker        (an "Over" leg: K or more)
+# and every "Under X" / "fewer than K" column (bet365's Under) into:
+#     Player | Stat | K | Line | Odds | Price | Bookmaker (an "Under" leg: fewer than K)
+# bet365's "Over X" column is an Over leg like any "N+" price, so both directions
+# (bet365 Under vs another book's Over, and bet365 Over vs another book's Under)
+# come out of the same tables.
+# Unders and Overs are then matched with one hash join on two ints: the
+# canonical player ID (players.py) and the (Stat, K) market key (markets.py).
+# The arbitrage condition is evaluated on whole columns. Pairs of legs at the
+# same bookmaker are never reported.
+# Declared stat relations (STAT_DOMINANCE) add cross-market pairs: an Under on
+# a stat that can never exceed another pairs with an Over on the larger stat.
+# Prices are parsed once, when the quote table is built, into uint16 odds-ladder
+# IDs (Price); the exact integer arb test and stakes read numerator and
+# denominator from the ladder tables (see odds.py).
+# scan_quotes runs the same scan straight on Quote records with dicts instead
+# of DataFrames; pandas is only imported (lazily) by the table functions.
+
+from __future__ import annotations
+
+from collections import namedtuple
+
+import numpy as np
+
+from lazy import lazy_module
+from markets import STAT_IDS, STAT_LABELS, k_over_line, k_under_line, market_key, market_keys
+from odds import PRICE_DEN, PRICE_NUM, PRICE_TEXT, arbitrage_stakes, is_arbitrage, price_id, price_ids
+from players import player_id, player_ids
+
+pd = lazy_module("pandas")
+
+OVER_COLUMNS = ["Player", "Stat", "K", "Odds", "Price", "Bookmaker"]
+UNDER_COLUMNS = ["Player", "Stat", "K", "Line", "Odds", "Price", "Bookmaker"]
+
+OPPORTUNITY_COLUMNS = [
+    "Market", "Player", "Line",
+    "Over Bookmaker", "Over Odds", "Under Bookmaker", "Under Odds",
+    "ROI", "Under Stake", "Over Stake", "Total Profit",
+]
+
+# One leg as emitted by the per-card extractors (see incremental.py).
+# Side is "Under" (fewer than K) or "Over" (K or more). A namedtuple has no
+# per-instance __dict__, so a page's worth of quotes stays small.
+Quote = namedtuple("Quote", ["Player", "Stat", "K", "Line", "Odds", "Side", "Bookmaker"])
+
+# (lower, upper): lower <= upper for every player in every match, so
+# "Under K on lower" + "K+ on upper" covers every outcome (lower >= K forces upper >= K)
+STAT_DOMINANCE = [
+    ("Player_Shots_On_Target", "Player_Total_Shots"),
+]
+
+def dominating_stats(relations=None) -> dict:
+    """lower stat -> every stat always >= it (transitive closure of the relations)."""
+    relations = STAT_DOMINANCE if relations is None else relations
+    upper = {}
+    for lower, higher in relations:
+        upper.setdefault(lower, set()).add(higher)
+    changed = True
+    while changed:
+        changed = False
+        for lower, highers in upper.items():
+            extra = set().union(*(upper.get(h, set()) for h in highers)) - highers - {lower}
+            if extra:
+                highers |= extra
+                changed = True
+    return {lower: sorted(highers) for lower, highers in upper.items()}
+
+def _keyed(q: pd.DataFrame, stat_column="Stat") -> pd.DataFrame:
+    """Add the integer join columns: player ID (players.py) and market key (unnamed players and unregistered stats dropped)."""
+    q = q.assign(__player=player_ids(q["Player"].to_numpy()), __market=market_keys(q[stat_column].to_numpy(), q["K"].to_numpy()))
+    return q[(q["__player"] > 0) & (q["__market"] > 0)]
+
+def _with_prices(q: pd.DataFrame) -> pd.DataFrame:
+    """Add the ladder Price ID for each Odds string and drop unreadable prices."""
+    q["Price"] = price_ids(q["Odds"].to_numpy())
+    return q[q["Price"] > 0]
+
+def over_quotes(parts: list) -> pd.DataFrame:
+    """
+    Concatenate per-market frames of Player | Stat | K | Odds | Bookmaker
+    into one Over quote table with parsed prices.
+    """
+    if not parts:
+        return pd.DataFrame(columns=OVER_COLUMNS)
+    q = pd.concat(parts, ignore_index=True)
+    q = q.dropna(subset=["K"])
+    q["K"] = q["K"].astype(int)
+    return _with_prices(q)[OVER_COLUMNS].reset_index(drop=True)
+
+def line_quotes(frames: dict, bookmaker: str, side="Under") -> pd.DataFrame:
+    """
+    Normalize {Stat: DataFrame[Player, side]} where the column looks like
+    "Under 1.5 4/6" or "Over 1.5 6/4".
+    Under X: K is the smallest count the Under loses to (Under 1.5 -> K = 2).
+    Over X:  K is the smallest count the Over wins with (Over 1.5 -> K = 2).
+    Odds is the canonical ladder spelling ("Under 1.5 EVS" -> "1/1").
+    """
+    columns = UNDER_COLUMNS if side == "Under" else OVER_COLUMNS
+    parts = []
+    for stat, df in frames.items():
+        if df is None or df.empty or side not in df.columns:
+            continue
+        text = df[side].fillna("").astype(str)
+        parts.append(pd.DataFrame({
+            "Player": df["Player"].values,
+            "Stat": stat,
+            "Line": pd.to_numeric(text.str.extract(r"(\d+(?:\.\d+)?)")[0], errors="coerce").values,
+            "Odds": text.str.rsplit(n=1).str[-1].values,
+        }))
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    q = _with_prices(pd.concat(parts, ignore_index=True).dropna(subset=["Line", "Odds"]))
+    q["Odds"] = [PRICE_TEXT[pid] for pid in q["Price"]]
+    q["K"] = k_under_line(q["Line"].to_numpy()) if side == "Under" else k_over_line(q["Line"].to_numpy())
+    q["Bookmaker"] = bookmaker
+    return q[columns].reset_index(drop=True)
+
+def find_arbitrage(unders: pd.DataFrame, overs: pd.DataFrame, stake=100) -> pd.DataFrame:
+    """
+    Pair every Under leg with the Over legs for the same (player, market key) at
+    other bookmakers in a single join and keep the pairs that are an exact
+    arbitrage (a·c > b·d).
+    If a bookmaker lists the same (player, Stat, K) twice the first quote is used.
+    """
+    if unders.empty or overs.empty:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+
+    keys = ["__player", "__market"]
+    u = _keyed(unders)
+    o = _keyed(overs).drop_duplicates(keys + ["Bookmaker"])
+    m = u.merge(o[keys + ["Odds", "Price", "Bookmaker"]], on=keys, suffixes=(" Under", " Over"))
+    return evaluate_pairs(m[m["Bookmaker Under"] != m["Bookmaker Over"]], stake)
+
+def find_dominance_arbitrage(unders: pd.DataFrame, overs: pd.DataFrame, stake=100, relations=None) -> pd.DataFrame:
+    """
+    Cross-market pairs from the declared stat relations: an Under on the lower
+    stat vs an Over on the upper stat for the same player and K, e.g.
+    bet365 "Under 0.5" Shots On Target + Sky "1+" Total Shots.
+    Each Under is relabelled with the stats that dominate it and matched in the
+    same kind of hash join as find_arbitrage, so no leg pairs are enumerated.
+    """
+    upper = dominating_stats(relations)
+    if unders.empty or overs.empty or not upper:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+
+    parts = [
+        unders[unders["Stat"] == lower].assign(**{"Over Stat": higher})
+        for lower, highers in upper.items()
+        for higher in highers
+    ]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+
+    keys = ["__player", "__market"]
+    u = _keyed(pd.concat(parts, ignore_index=True), stat_column="Over Stat")
+    o = _keyed(overs).drop_duplicates(keys + ["Bookmaker"])
+    m = u.merge(o[keys + ["Odds", "Price", "Bookmaker"]], on=keys, suffixes=(" Under", " Over"))
+    return evaluate_pairs(m[m["Bookmaker Under"] != m["Bookmaker Over"]], stake)
+
+def find_all_arbitrage(unders: pd.DataFrame, overs: pd.DataFrame, stake=100) -> pd.DataFrame:
+    """Same-market and cross-market (STAT_DOMINANCE) opportunities in one table."""
+    found = [df for df in (find_arbitrage(unders, overs, stake), find_dominance_arbitrage(unders, overs, stake)) if not df.empty]
+    if not found:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+    return pd.concat(found, ignore_index=True)
+
+def market_label(stat, over_stat=None) -> str:
+    label = STAT_LABELS.get(stat, stat)
+    if over_stat is None or over_stat == stat:
+        return label
+    return f"{label} Under / {STAT_LABELS.get(over_stat, over_stat)} Over"
+
+def evaluate_pairs(m: pd.DataFrame, stake=100) -> pd.DataFrame:
+    """
+    Arbitrage test and stakes for row-aligned leg pairs: Player | Stat | Line |
+    Odds/Price/Bookmaker Under | Odds/Price/Bookmaker Over, plus Over Stat for
+    cross-market pairs. Returns the arbitrages.
+    """
+    if m.empty:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+    under_ids, over_ids = m["Price Under"].to_numpy(np.uint16), m["Price Over"].to_numpy(np.uint16)
+    a, b = PRICE_NUM[under_ids], PRICE_DEN[under_ids]
+    c, d = PRICE_NUM[over_ids], PRICE_DEN[over_ids]
+    hit = is_arbitrage(a, b, c, d)
+    if not hit.any():
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+    m = m[hit]
+    roi, under_stake, over_stake, total_profit = arbitrage_stakes(a[hit], b[hit], c[hit], d[hit], stake)
+
+    if "Over Stat" in m.columns:
+        market = pd.Series([market_label(s, o) for s, o in zip(m["Stat"], m["Over Stat"])], index=m.index)
+    else:
+        market = m["Stat"].map(STAT_LABELS).fillna(m["Stat"])
+
+    out = pd.DataFrame({
+        "Market": market,
+        "Player": m["Player"],
+        "Line": m["Line"],
+        "Over Bookmaker": m["Bookmaker Over"],
+        "Over Odds": m["Odds Over"],
+        "Under Bookmaker": m["Bookmaker Under"],
+        "Under Odds": m["Odds Under"],
+        "ROI": roi,
+        "Under Stake": under_stake,
+        "Over Stake": over_stake,
+        "Total Profit": total_profit,
+    })
+    return out.reset_index(drop=True)
+
+def scan_quotes(quotes, stake=100, relations=None) -> list:
+    """
+    find_all_arbitrage on Quote records without building DataFrames: Overs
+    are indexed by (player ID, market key) in a dict and every Under probes
+    its own market and the markets dominating it. Same pairs, same exact test
+    and the same numbers; returns opportunity dicts keyed by OPPORTUNITY_COLUMNS.
+    """
+    overs = {}   # (player ID, market key) -> {bookmaker: (quote, price ID)}, first quote per book
+    unders = []  # (player ID, quote, price ID)
+    for q in quotes:
+        pid, player = price_id(q.Odds), player_id(q.Player)
+        if not pid or not player or q.Stat not in STAT_IDS:
+            continue
+        if q.Side == "Over":
+            overs.setdefault((player, market_key(q.Stat, q.K)), {}).setdefault(q.Bookmaker, (q, pid))
+        else:
+            unders.append((player, q, pid))
+
+    upper = dominating_stats(relations)
+    found = []
+    for player, u, under_pid in unders:
+        a, b = int(PRICE_NUM[under_pid]), int(PRICE_DEN[under_pid])
+        for over_stat in [u.Stat] + upper.get(u.Stat, []):
+            for book, (o, over_pid) in overs.get((player, market_key(over_stat, u.K)), {}).items():
+                if book == u.Bookmaker:
+                    continue
+                c, d = int(PRICE_NUM[over_pid]), int(PRICE_DEN[over_pid])
+                if a * c <= b * d:
+                    continue
+                q = d * (a + b) + b * (c + d)
+                under_stake = stake * (b * (c + d)) / q
+                edge = (a * c - b * d) / q
+                found.append({
+                    "Market": market_label(u.Stat, over_stat),
+                    "Player": u.Player,
+                    "Line": u.Line,
+                    "Over Bookmaker": book,
+                    "Over Odds": o.Odds,
+                    "Under Bookmaker": u.Bookmaker,
+                    "Under Odds": PRICE_TEXT[under_pid],
+                    "ROI": edge * 100,
+                    "Under Stake": under_stake,
+                    "Over Stake": stake - under_stake,
+                    "Total Profit": edge * stake,
+                })
+    return found
@@ -0,0 +1,124 @@
+# batch_scan.py
+#
+# Batch mode: every fixture saved in one directory, parsed in parallel.
+#   python batch_scan.py <directory> [workers]
+#
+# Files are grouped by fixture from their names, <fixture><bookmaker>.html, e.g.
+#   whubre365.html  whubrebw.html  whubresky.html  whubrewh.html
+#   arsenal_v_chelsea_bet365.html  arsenal_v_chelsea_skybet.html ...
+# Parsing is GIL-bound BeautifulSoup work, so every page is scraped in its own
+# process-pool task (one task per file keeps the pool busy even when fixtures
+# have different numbers of pages). The pairwise scans are cheap and run in the
+# parent once a fixture's pages are in, and all opportunities are merged into
+# one table ranked by ROI.
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import html_backend
+from arb_engine import OPPORTUNITY_COLUMNS
+from bet365_scraper import scrape_bet365
+from combined_all_bet365 import BOOKMAKERS, print_opportunity
+from opportunity_stream import DELTA_STREAM, LOG, publish
+from players import save_players
+from scrape_cache import cached_scrape
+from snapshot_names import parse_snapshot_name
+
+SCRAPERS = {"Bet365": scrape_bet365, **{name: scraper for name, (scraper, _) in BOOKMAKERS.items()}}
+
+BATCH_COLUMNS = ["Fixture"] + OPPORTUNITY_COLUMNS
+
+def find_fixtures(directory) -> dict:
+    """{fixture: {bookmaker: path}} for every saved page in `directory` (fixtures need a bet365 page)."""
+    fixtures = {}
+    for name in sorted(os.listdir(directory)):
+        parsed = parse_snapshot_name(name)
+        if not parsed:
+            continue
+        fixture, book = parsed
+        pages = fixtures.setdefault(fixture, {})
+        if book in pages:
+            print(f"Ignoring {name}: {fixture} already has a {book} page", file=LOG)
+            continue
+        pages[book] = os.path.join(directory, name)
+
+    for fixture in [f for f, pages in fixtures.items() if "Bet365" not in pages]:
+        print(f"Skipping {fixture}: no bet365 page", file=LOG)
+        del fixtures[fixture]
+    return fixtures
+
+def _init_worker(parser, strain_markets):
+    # Spawned workers re-import html_backend; carry over the parent's settings
+    html_backend.set_html_parser(parser)
+    html_backend.STRAIN_MARKETS = strain_markets
+
+def _scrape_page(book, path, use_cache):
+    scraper = SCRAPERS[book]
+    return cached_scrape(scraper, path) if use_cache else scraper(path)
+
+def _scan_fixture(fixture, tables: dict, stake):
+    opportunities = []
+    for book, dataframes in tables.items():
+        if book != "Bet365":
+            opportunities.extend(BOOKMAKERS[book][1](tables["Bet365"], dataframes, stake=stake))
+    for opp in opportunities:
+        opp["Fixture"] = fixture
+    return opportunities
+
+def run_batch(directory, stake=100, workers=None, use_cache=True, fixtures=None) -> pd.DataFrame:
+    """
+    Scrape every fixture's pages in a process pool and scan each fixture as
+    soon as all its pages are parsed.
+    fixtures: find_fixtures(directory), if the caller has already grouped the pages.
+    Returns one DataFrame (Fixture + the usual opportunity columns) ranked by ROI.
+    """
+    if fixtures is None:
+        fixtures = find_fixtures(directory)
+    pending = {fixture: len(pages) for fixture, pages in fixtures.items()}
+    tables = {fixture: {} for fixture in fixtures}
+    opportunities = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(html_backend.HTML_PARSER, html_backend.STRAIN_MARKETS)) as pool:
+        futures = {
+            pool.submit(_scrape_page, book, path, use_cache): (fixture, book)
+            for fixture, pages in fixtures.items()
+            for book, path in pages.items()
+        }
+        for future in as_completed(futures):
+            fixture, book = futures[future]
+            try:
+                tables[fixture][book] = future.result()
+            except Exception as e:
+                print(f"Failed to scrape {fixture} {book}: {e}", file=LOG)
+            pending[fixture] -= 1
+            if pending[fixture] == 0:
+                if "Bet365" in tables[fixture]:
+                    opportunities.extend(_scan_fixture(fixture, tables[fixture], stake))
+                del tables[fixture]
+
+    save_players()
+
+    df = pd.DataFrame(opportunities, columns=BATCH_COLUMNS)
+    if not df.empty:
+        df = df.sort_values(["ROI", "Fixture"], ascending=[False, True], ignore_index=True)
+    return df
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python batch_scan.py <directory> [workers]")
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    fixtures = find_fixtures(sys.argv[1])
+    opportunities_df = run_batch(sys.argv[1], workers=workers, fixtures=fixtures)
+
+    if DELTA_STREAM:
+        publish(opportunities_df, list(fixtures))
+    else:
+        if opportunities_df.empty:
+            print("No arbitrage opportunities found.")
+        for _, opp in opportunities_df.iterrows():
+            print(f"Fixture: {opp['Fixture']}")
+            print_opportunity(opp)
@@ -0,0 +1,73 @@
+# benchmark_parsers.py
+#
+# Time every installed HTML backend, with and without the per-bookmaker
+# strainers, on the same saved pages and check that each combination extracts
+# exactly the same tables as a full "html.parser" parse.
+#   python benchmark_parsers.py [repeats]
+
+import sys
+import time
+import pandas as pd
+
+import html_backend
+from bet365_scraper import scrape_bet365
+from combined_betway_bet365 import scrape_betway
+from combined_sky_bet365 import scrape_skybet
+from combined_wh_bet365 import scrape_william_hill_html
+from combined_all_bet365 import (
+    bet365_file_path, betway_file_path, skybet_file_path, williamhill_file_path,
+)
+
+# name -> (scraper, saved page)
+BENCHMARK_FILES = {
+    "Bet365":       (scrape_bet365,            bet365_file_path),
+    "Betway":       (scrape_betway,            betway_file_path),
+    "SkyBet":       (scrape_skybet,            skybet_file_path),
+    "William Hill": (scrape_william_hill_html, williamhill_file_path),
+}
+
+def _same_tables(a: dict, b: dict) -> bool:
+    if a.keys() != b.keys():
+        return False
+    return all(a[k].reset_index(drop=True).equals(b[k].reset_index(drop=True)) for k in a)
+
+def compare_parsers(files=None, parsers=None, repeats=3):
+    """
+    Returns a DataFrame: Bookmaker | Parser | Strained | Best (ms) | Speedup | Same Tables.
+    Speedup and Same Tables are relative to a full-DOM "html.parser" parse.
+    """
+    files = files or BENCHMARK_FILES
+    parsers = parsers or html_backend.available_parsers()
+    previous = html_backend.HTML_PARSER, html_backend.STRAIN_MARKETS
+    rows = []
+    try:
+        for book, (scraper, path) in files.items():
+            reference = baseline_ms = None
+            ordered = ["html.parser"] + [p for p in parsers if p != "html.parser"]
+            for parser, strained in [(p, s) for p in ordered for s in (False, True)]:
+                html_backend.set_html_parser(parser)
+                html_backend.STRAIN_MARKETS = strained
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    tables = scraper(path)
+                    timings.append((time.perf_counter() - start) * 1000)
+                best = min(timings)
+                if reference is None:
+                    reference, baseline_ms = tables, best
+                rows.append({
+                    "Bookmaker": book,
+                    "Parser": parser,
+                    "Strained": strained,
+                    "Best (ms)": round(best, 1),
+                    "Speedup": round(baseline_ms / best, 2) if best else None,
+                    "Same Tables": _same_tables(reference, tables),
+                })
+    finally:
+        html_backend.set_html_parser(previous[0])
+        html_backend.STRAIN_MARKETS = previous[1]
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(compare_parsers(repeats=repeats).to_string(index=False))
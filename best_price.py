@@ -0,0 +1,125 @@
+# best_price.py
+#
+# Best-price book across every loaded bookmaker.
+# For each (player, market key, Side) only the top price is kept, so the arbitrage
+# scan sees one Under and one Over per market however many books are loaded:
+#   - a quote arriving is one O(1) compare against the current best for its key
+#   - the scan is one exact a·c > b·d test per (player, market key), plus one per
+#     declared cross-market relation (arb_engine.STAT_DOMINANCE)
+# Prices are compared exactly on the ladder integers: a/b beats c/d iff a·d > c·b.
+# Ties keep the quote that arrived first. A bookmaker re-quoting the current
+# best lower re-picks the best among that key's books (a handful at most).
+# Both sides can come from any book (bet365 quotes Over and Under); when the
+# best Under and best Over are at the same bookmaker, the better of
+# (best Under, best other-book Over) and (best other-book Under, best Over) is used.
+
+from __future__ import annotations
+
+from arb_engine import OPPORTUNITY_COLUMNS, dominating_stats, evaluate_pairs
+from lazy import lazy_module
+from markets import market_key
+from odds import PRICE_DEN, PRICE_NUM
+from players import player_id
+
+pd = lazy_module("pandas")
+
+def _beats(price, other) -> bool:
+    return int(PRICE_NUM[price]) * int(PRICE_DEN[other]) > int(PRICE_NUM[other]) * int(PRICE_DEN[price])
+
+def _edge(under, over) -> tuple:
+    """(a·c − b·d, Q): the pair's ROI as an exact fraction (see odds.py)."""
+    a, b = int(PRICE_NUM[under["Price"]]), int(PRICE_DEN[under["Price"]])
+    c, d = int(PRICE_NUM[over["Price"]]), int(PRICE_DEN[over["Price"]])
+    return a * c - b * d, d * (a + b) + b * (c + d)
+
+class BestPriceBook:
+    """Top Under and Over price per (player, Stat, K) across bookmakers."""
+
+    def __init__(self):
+        self._quotes = {}  # (player, market key, Side) -> {bookmaker: row}
+        self._best = {}    # (player, market key, Side) -> row with the top price
+
+    def __len__(self):
+        return len(self._best)
+
+    def add(self, side, row: dict):
+        """
+        Offer one leg; row holds the quote-table columns (Player, Stat, K,
+        [Line,] Odds, Price, Bookmaker). Returns True if it is now the best price.
+        """
+        key = (player_id(row["Player"]), market_key(row["Stat"], row["K"]), side)
+        books = self._quotes.setdefault(key, {})
+        previous = books.get(row["Bookmaker"])
+        books[row["Bookmaker"]] = row
+
+        best = self._best.get(key)
+        if best is None or _beats(row["Price"], best["Price"]):
+            self._best[key] = row
+        elif best is previous:  # the best book shortened its own price
+            self._best[key] = self._pick(books)
+        return self._best[key] is row
+
+    @staticmethod
+    def _pick(books: dict, exclude=None):
+        best = None
+        for name, row in books.items():
+            if name == exclude:
+                continue
+            if best is None or _beats(row["Price"], best["Price"]):
+                best = row
+        return best
+
+    def add_unders(self, unders: pd.DataFrame):
+        for row in unders.to_dict("records"):
+            self.add("Under", row)
+
+    def add_overs(self, overs: pd.DataFrame):
+        for row in overs.to_dict("records"):
+            self.add("Over", row)
+
+    def _best_pair(self, under_key, over_key):
+        under, over = self._best[under_key], self._best[over_key]
+        if under["Bookmaker"] != over["Bookmaker"]:
+            return under, over
+        book = under["Bookmaker"]
+        candidates = [
+            (under, self._pick(self._quotes[over_key], exclude=book)),
+            (self._pick(self._quotes[under_key], exclude=book), over),
+        ]
+        candidates = [(u, o) for u, o in candidates if u is not None and o is not None]
+        if len(candidates) == 2:
+            (n1, q1), (n2, q2) = _edge(*candidates[0]), _edge(*candidates[1])
+            return candidates[1] if n2 * q1 > n1 * q2 else candidates[0]
+        return candidates[0] if candidates else None
+
+    def arbitrage(self, stake=100, relations=None) -> pd.DataFrame:
+        """
+        Opportunities on the best Under vs the best Over for every market, and
+        for every declared stat relation (Under on the lower stat vs Over on the
+        upper one), ranked by ROI.
+        """
+        upper = dominating_stats(relations)
+        rows = []
+        for under_key, best_under in self._best.items():
+            if under_key[2] != "Under":
+                continue
+            stat, k = best_under["Stat"], best_under["K"]
+            for over_stat in [stat] + upper.get(stat, []):
+                over_key = (under_key[0], market_key(over_stat, k), "Over")
+                if over_key not in self._best:
+                    continue
+                pair = self._best_pair(under_key, over_key)
+                if pair is None:
+                    continue
+                under, over = pair
+                rows.append({
+                    "Player": under["Player"], "Stat": under["Stat"], "Over Stat": over_stat, "Line": under["Line"],
+                    "Odds Under": under["Odds"], "Price Under": under["Price"], "Bookmaker Under": under["Bookmaker"],
+                    "Odds Over": over["Odds"], "Price Over": over["Price"], "Bookmaker Over": over["Bookmaker"],
+                })
+        if not rows:
+            return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+        found = evaluate_pairs(pd.DataFrame(rows), stake)
+        if not found.empty:
+            found = found.sort_values("ROI", ascending=False, ignore_index=True)
+        return found
@@ -0,0 +1,192 @@
+# bet365_scraper.py
+
+from bs4 import SoupStrainer
+
+from arb_engine import Quote, line_quotes
+from html_backend import load_soup
+from lazy import lazy_module
+from markets import k_over_line, k_under_line, market_titles
+from opportunity_stream import LOG
+
+pd = lazy_module("pandas")
+
+# =========================================================
+# BET365 SCRAPING — exact section titles (Over/Under cards)
+#    Shared by every combined_*_bet365.py script so the bet365 page is
+#    parsed once per run, however many bookmakers it is compared against.
+#    Returns dict with keys:
+#       Player_Shots_On_Target | Player_Total_Shots | Player_Fouls_Committed | Player_Tackles
+#    Each DataFrame: columns ["Player", "Over", "Under"] with values like "Under 0.5 4/6"
+# =========================================================
+
+# stat -> exact card title, from the market registry
+BET365_EXACT_TITLES = market_titles("Bet365")
+
+# Only the market cards are built; nav, banners and scripts are skipped at parse time
+BET365_PARSE_ONLY = SoupStrainer("div", class_="gl-MarketGroup")
+
+def _title_of(mg):
+    # Titles appear in one of these nodes; we read exact text
+    t = mg.find("div", class_="gl-MarketGroup_Name")
+    if not t:
+        t = mg.find("div", class_="cm-MarketGroupWithIconsButton_Text")
+    return t.get_text(strip=True) if t else ""
+
+def _b365_extract_names(market_root):
+    # Player labels in this grid
+    return [
+        div.get_text(strip=True)
+        for div in market_root.find_all("div", class_="srb-ParticipantLabelWithTeam_Name")
+    ]
+
+def _b365_index_cards(market_groups):
+    """
+    One pass over the page: exact card title -> gl-MarketGroup.
+    The first card wins if a title repeats.
+    """
+    cards = {}
+    for mg in market_groups:
+        cards.setdefault(_title_of(mg), mg)
+    return cards
+
+def _b365_extract_cells(market_root):
+    """
+    Return ordered list of (handicap, odds) cells.
+    Prefer CenteredStacked (handicap + odds); fallback to odds-only if needed.
+    """
+    cells = []
+    for cell in market_root.find_all("div", class_="gl-ParticipantCenteredStacked"):
+        h = cell.find("span", class_="gl-ParticipantCenteredStacked_Handicap")
+        o = cell.find("span", class_="gl-ParticipantCenteredStacked_Odds")
+        if h and o:
+            cells.append((h.get_text(strip=True), o.get_text(strip=True)))
+    if not cells:
+        for oo in market_root.find_all("span", class_="gl-ParticipantOddsOnly_Odds"):
+            cells.append(("", oo.get_text(strip=True)))
+    return cells
+
+def _b365_extract_market_df(market_root, label_text: str):
+    """
+    Build DataFrame with columns: Player | {label_text}
+    Row example: "Over 0.5 10/11" or "Under 1.5 4/5".
+    """
+    names = _b365_extract_names(market_root)
+    cells = _b365_extract_cells(market_root)
+    n = min(len(names), len(cells))
+    rows = []
+    for i in range(n):
+        player = names[i]
+        hc, ov = cells[i]
+        rows.append({"Player": player, label_text: f"{label_text} {hc} {ov}".strip()})
+    return pd.DataFrame(rows, columns=["Player", label_text])
+
+def scrape_bet365(file_path):
+    """
+    For each exact market title T, look for cards whose title is exactly:
+      - T
+      - T + " - Over"
+      - T + " - Under"
+    If only a combined card T is found, split the cells into two halves by name count.
+    """
+    try:
+        soup = load_soup(file_path, parse_only=BET365_PARSE_ONLY)
+
+        # Index every card by its exact title once; each market is then a dict lookup
+        cards = _b365_index_cards(soup.find_all("div", class_="gl-MarketGroup"))
+        out = {}
+
+        for key_name, exact_title in BET365_EXACT_TITLES.items():
+            over_df = under_df = None
+            over_mg = cards.get(exact_title + " - Over")
+            under_mg = cards.get(exact_title + " - Under")
+            combined_mg = cards.get(exact_title)
+
+            if over_mg is not None:
+                over_df = _b365_extract_market_df(over_mg, "Over")
+            if under_mg is not None:
+                under_df = _b365_extract_market_df(under_mg, "Under")
+
+            if over_df is None and under_df is None and combined_mg is not None:
+                # Split combined card into Over/Under halves by number of names/cells
+                names = _b365_extract_names(combined_mg)
+                cells = _b365_extract_cells(combined_mg)
+                N = len(names)
+                if N and len(cells) >= 2 * N:
+                    over_cells = cells[:N]
+                    under_cells = cells[N:2 * N]
+                    over_df = pd.DataFrame({
+                        "Player": names,
+                        "Over": [f"Over {h} {o}".strip() for (h, o) in over_cells]
+                    })
+                    under_df = pd.DataFrame({
+                        "Player": names,
+                        "Under": [f"Under {h} {o}".strip() for (h, o) in under_cells]
+                    })
+
+            if over_df is not None and "Over" in over_df.columns and under_df is not None and "Under" in under_df.columns:
+                merged = pd.merge(over_df, under_df, on="Player", how="inner")
+            elif over_df is not None:
+                merged = over_df.copy(); merged["Under"] = ""
+            elif under_df is not None:
+                merged = under_df.copy(); merged["Over"] = ""
+            else:
+                merged = pd.DataFrame(columns=["Player", "Over", "Under"])
+
+            out[key_name] = merged[["Player", "Over", "Under"]]
+
+        return out
+
+    except FileNotFoundError:
+        print(f"Error: The file at {file_path} was not found.", file=LOG)
+        return {}
+    except Exception as e:
+        print(f"An error occurred: {e}", file=LOG)
+        return {}
+
+def bet365_under_quotes(bet365_dataframes: dict):
+    """bet365 Under column as a normalized quote table (see arb_engine.line_quotes)."""
+    return line_quotes(bet365_dataframes, "Bet365", "Under")
+
+def bet365_over_quotes(bet365_dataframes: dict):
+    """bet365 Over column as an Over quote table, for scans against other books' Unders."""
+    return line_quotes(bet365_dataframes, "Bet365", "Over")
+
+# =========================================================
+# PER-CARD EXTRACTION (incremental rescans, see incremental.py)
+#    bet365_cards yields each market's Over and Under cards (or the combined
+#    card); bet365_card_quotes turns one card into Quote records.
+# =========================================================
+
+def bet365_cards(soup):
+    cards = _b365_index_cards(soup.find_all("div", class_="gl-MarketGroup"))
+    for stat, exact_title in BET365_EXACT_TITLES.items():
+        over_title, under_title = exact_title + " - Over", exact_title + " - Under"
+        if over_title in cards:
+            yield (stat, "Over"), cards[over_title]
+        if under_title in cards:
+            yield (stat, "Under"), cards[under_title]
+        if over_title not in cards and under_title not in cards and exact_title in cards:
+            yield (stat, "Combined"), cards[exact_title]
+
+def _b365_side_quotes(stat, side, names, cells):
+    quotes = []
+    for player, (hc, odds) in zip(names, cells):
+        try:
+            line = float(hc)
+        except ValueError:
+            continue
+        k = int(k_under_line(line) if side == "Under" else k_over_line(line))
+        quotes.append(Quote(player, stat, k, line, odds, side, "Bet365"))
+    return quotes
+
+def bet365_card_quotes(key, card):
+    stat, layout = key
+    names = _b365_extract_names(card)
+    cells = _b365_extract_cells(card)
+    if layout != "Combined":
+        return _b365_side_quotes(stat, layout, names, cells)
+    # Over cells first, then Under cells, one per name
+    N = len(names)
+    if not N or len(cells) < 2 * N:
+        return []
+    return _b365_side_quotes(stat, "Over", names, cells[:N]) + _b365_side_quotes(stat, "Under", names, cells[N:2 * N])
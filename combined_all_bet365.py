@@ -0,0 +1,130 @@
+# combined_all_bet365.py
+#
+# One refresh over every saved bookmaker page:
+#   - each HTML file is parsed exactly once
+#   - the bet365 Over/Under tables are kept in memory
+#   - every pairwise scan (Betway, Sky Bet, William Hill) runs off those tables
+#   - or, with best_price=True, one scan of the best Under vs the best Over
+#     across all loaded books (see best_price.py)
+
+from __future__ import annotations
+
+import os
+
+from arb_engine import OPPORTUNITY_COLUMNS
+from best_price import BestPriceBook
+from bet365_scraper import scrape_bet365, bet365_under_quotes, bet365_over_quotes
+from combined_betway_bet365 import scrape_betway, find_betway_arbitrage, betway_quotes
+from combined_sky_bet365 import scrape_skybet, find_skybet_arbitrage, skybet_quotes
+from combined_wh_bet365 import scrape_william_hill_html, find_williamhill_arbitrage, williamhill_quotes
+from lazy import lazy_module
+from opportunity_stream import DELTA_STREAM, LOG, fixture_name, publish
+from players import save_players
+from scrape_cache import cached_scrape
+
+pd = lazy_module("pandas")
+
+# =========================================================
+# 0) CONFIG: set these to your saved HTML files
+#    Leave a path as None (or point it at a missing file) to skip that bookmaker.
+# =========================================================
+bet365_file_path      = r"C:\Users\AhmedZ\Downloads\whubre365.html"
+betway_file_path      = r"C:\Users\AhmedZ\Downloads\whubrebw.html"
+skybet_file_path      = r"C:\Users\AhmedZ\Downloads\whubresky.html"
+williamhill_file_path = r"C:\Users\AhmedZ\Downloads\whubrewh.html"
+
+# name -> (scraper, scan against bet365 tables)
+BOOKMAKERS = {
+    "Betway":       (scrape_betway,            find_betway_arbitrage),
+    "SkyBet":       (scrape_skybet,            find_skybet_arbitrage),
+    "William Hill": (scrape_william_hill_html, find_williamhill_arbitrage),
+}
+
+# name -> scraped tables as an Over quote table (arb_engine)
+OVER_QUOTERS = {
+    "Betway":       betway_quotes,
+    "SkyBet":       skybet_quotes,
+    "William Hill": williamhill_quotes,
+}
+
+# Scan best prices across all books instead of each bet365/bookmaker pair
+BEST_PRICE = True
+
+# =========================================================
+# 1) PIPELINE
+# =========================================================
+
+def find_best_price_arbitrage(bet365_dataframes, bookmaker_dataframes: dict, stake=100) -> pd.DataFrame:
+    """Best Under vs best Over across bet365 and every loaded bookmaker, one test per market."""
+    book = BestPriceBook()
+    book.add_unders(bet365_under_quotes(bet365_dataframes))
+    book.add_overs(bet365_over_quotes(bet365_dataframes))
+    for name, dataframes in bookmaker_dataframes.items():
+        book.add_overs(OVER_QUOTERS[name](dataframes))
+    return book.arbitrage(stake)
+
+def run_all(bet365_path, bookmaker_paths: dict, stake=100, use_cache=True, best_price=False):
+    """
+    Parse bet365 once and every other bookmaker file once, then run each
+    bet365-vs-bookmaker scan on the in-memory tables (or, with best_price,
+    a single scan on the best prices across all of them).
+    With use_cache, pages unchanged since an earlier run are loaded from
+    scrape_cache instead of being parsed again.
+
+    bookmaker_paths maps a BOOKMAKERS name to its saved HTML path.
+    Returns (bet365_dataframes, {bookmaker: dataframes}, opportunities_df).
+    """
+    def scrape(scraper, path):
+        return cached_scrape(scraper, path) if use_cache else scraper(path)
+
+    bet365_dataframes = scrape(scrape_bet365, bet365_path)
+
+    bookmaker_dataframes = {}
+    opportunities = []
+    for name, path in bookmaker_paths.items():
+        if not path or not os.path.exists(path):
+            print(f"Skipping {name}: no saved page at {path}", file=LOG)
+            continue
+        scraper, scan = BOOKMAKERS[name]
+        bookmaker_dataframes[name] = scrape(scraper, path)
+        if not best_price:
+            opportunities.extend(scan(bet365_dataframes, bookmaker_dataframes[name], stake=stake))
+
+    if best_price:
+        opportunities_df = find_best_price_arbitrage(bet365_dataframes, bookmaker_dataframes, stake)
+    else:
+        opportunities_df = pd.DataFrame(opportunities, columns=OPPORTUNITY_COLUMNS)
+        if not opportunities_df.empty:
+            opportunities_df = opportunities_df.sort_values("ROI", ascending=False, ignore_index=True)
+    save_players()  # keep player IDs stable for the next run
+    return bet365_dataframes, bookmaker_dataframes, opportunities_df
+
+def print_opportunity(opp, stake=100):
+    print(f"ARBITRAGE OPPORTUNITY - {opp['Market']}")
+    print(f"Player: {opp['Player']}")
+    print(f"{opp['Under Bookmaker']} 'Under {opp['Line']}' Odds: {opp['Under Odds']}")
+    print(f"{opp['Over Bookmaker']} Odds: {opp['Over Odds']}")
+    print(f"Guaranteed ROI: {opp['ROI']:.2f}%")
+    print(f"Suggested Bet on {opp['Under Bookmaker']}: £{opp['Under Stake']:.2f}")
+    print(f"Suggested Bet on {opp['Over Bookmaker']}: £{opp['Over Stake']:.2f}")
+    print(f"Total Profit with £{stake} wallet: £{opp['Total Profit']:.2f}")
+    print("-" * 50)
+
+# =========================================================
+# 2) RUN
+# =========================================================
+
+if __name__ == "__main__":
+    _, _, opportunities_df = run_all(bet365_file_path, {
+        "Betway": betway_file_path,
+        "SkyBet": skybet_file_path,
+        "William Hill": williamhill_file_path,
+    }, best_price=BEST_PRICE)
+
+    if DELTA_STREAM:
+        publish(opportunities_df, [fixture_name(bet365_file_path)])
+    else:
+        if opportunities_df.empty:
+            print("No arbitrage opportunities found.")
+        for _, opp in opportunities_df.iterrows():
+            print_opportunity(opp)
@@ -1,11 +1,15 @@
-# bet365_betway_arbitrage.py
+# combined_betway_bet365.py
 
 import re
-import math
-import numpy as np
-import pandas as pd
-from bs4 import BeautifulSoup
-from fractions import Fraction
+from bs4 import SoupStrainer, Tag
+
+from arb_engine import Quote, find_all_arbitrage, over_quotes
+from bet365_scraper import scrape_bet365, bet365_under_quotes
+from html_backend import load_soup
+from lazy import lazy_module
+from markets import k_at_least, market_titles
+
+pd = lazy_module("pandas")
 
 # =========================================================
 # 0) CONFIG: set these to your saved HTML files
@@ -14,344 +18,197 @@ bet365_file_path = r"C:\Users\AhmedZ\Downloads\whubre365.html"
 betway_file_path = r"C:\Users\AhmedZ\Downloads\whubrebw.html"
 
 # =========================================================
-# 1) BET365 SCRAPING — exact section titles (Over/Under cards)
-#    Returns dict with keys:
-#       Player_Shots_On_Target | Player_Total_Shots | Player_Fouls_Committed | Player_Tackles
-#    Each DataFrame: columns ["Player", "Over", "Under"] with values like "Under 0.5 4/6"
+# 1) BETWAY SCRAPING — paired-row table layout
+#    Returns dict of DataFrames keyed by exact section title strings:
+#       "Player To Have 1+ Shots", "Player To Have 2+ Shots", ...,
+#       "Player To Have 1+ Shots On Target", ...
 # =========================================================
 
-BET365_EXACT_TITLES = {
-    "Player_Shots_On_Target": "Player Shots On Target Over/Under",
-    "Player_Total_Shots":     "Player Shots Over/Under",
-    "Player_Fouls_Committed": "Player Fouls Over/Under",
-    "Player_Tackles":         "Player Tackles Over/Under",
-}
+# Each "Player To Have" table lives in its own market-table-section
+BETWAY_PARSE_ONLY = SoupStrainer(attrs={"data-testid": "market-table-section"})
 
-_FRACT_RE = re.compile(r"(?:\d+/\d+|EVS|Evens|EVENS)", re.I)
+# Matched by attribute lookups on each tag rather than CSS selectors:
+# soupsieve re-tests every descendant against every selector per call
+_SECTION_ATTRS = {"data-testid": "market-table-section"}
+_OUTCOME_FRACTION_RE = re.compile(r"(\d+/\d+)")
 
-def _norm_frac(s: str) -> str:
-    s = s.strip().upper()
-    return "1/1" if s in {"EVS", "EVENS"} else s.lower()
+# Betway section suffix -> stat key, from the market registry
+BETWAY_STATS = {title: stat for stat, title in market_titles("Betway").items()}
 
-def _title_of(mg):
-    t = mg.find("div", class_="gl-MarketGroup_Name")
-    if not t:
-        t = mg.find("div", class_="cm-MarketGroupWithIconsButton_Text")
-    return t.get_text(strip=True) if t else ""
+_BETWAY_SECTION_RE = re.compile(r"^Player To Have (\d+)\+ (.+)$")
 
-def _b365_extract_names(market_root):
-    return [
-        div.get_text(strip=True)
-        for div in market_root.find_all("div", class_="srb-ParticipantLabelWithTeam_Name")
-    ]
-
-def _b365_extract_cells(market_root):
-    """
-    Return ordered list of (handicap, odds) cells.
-    Prefer CenteredStacked (handicap + odds); fallback to odds-only if needed.
-    """
-    cells = []
-    for cell in market_root.find_all("div", class_="gl-ParticipantCenteredStacked"):
-        h = cell.find("span", class_="gl-ParticipantCenteredStacked_Handicap")
-        o = cell.find("span", class_="gl-ParticipantCenteredStacked_Odds")
-        if h and o:
-            cells.append((h.get_text(strip=True), o.get_text(strip=True)))
-    if not cells:
-        for oo in market_root.find_all("span", class_="gl-ParticipantOddsOnly_Odds"):
-            cells.append(("", oo.get_text(strip=True)))
-    return cells
+def _betway_market(section_title):
+    """"Player To Have 2+ Shots" -> (stat, k), or None for a market outside the registry."""
+    m = _BETWAY_SECTION_RE.match(section_title)
+    if not m or m.group(2) not in BETWAY_STATS:
+        return None
+    return BETWAY_STATS[m.group(2)], k_at_least(int(m.group(1)))
 
-def _b365_extract_market_df(market_root, label_text: str):
+def _betway_extract_price(td):
     """
-    Build DataFrame with columns: Player | {label_text}
-    Row example: "Over 0.5 10/11" or "Under 1.5 4/5".
+    One walk over an odds cell: the first price span's text, else the
+    fraction in the first outcome button's data-outcomename ("Callum Wilson 3/8").
     """
-    names = _b365_extract_names(market_root)
-    cells = _b365_extract_cells(market_root)
-    n = min(len(names), len(cells))
-    rows = []
-    for i in range(n):
-        player = names[i]
-        hc, ov = cells[i]
-        rows.append({"Player": player, label_text: f"{label_text} {hc} {ov}".strip()})
-    return pd.DataFrame(rows, columns=["Player", label_text])
-
-def scrape_bet365(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as html_file:
-            soup = BeautifulSoup(html_file, 'html.parser')
-
-        market_groups = soup.find_all("div", class_="gl-MarketGroup")
-        out = {}
-
-        # For each exact market title T, look for exact cards:
-        #   T,  T - Over,  T - Under
-        for key_name, exact_title in BET365_EXACT_TITLES.items():
-            over_df = under_df = combined_df = None
-
-            for mg in market_groups:
-                title = _title_of(mg)
-                if title == exact_title + " - Over":
-                    over_df = _b365_extract_market_df(mg, "Over")
-                elif title == exact_title + " - Under":
-                    under_df = _b365_extract_market_df(mg, "Under")
-                elif title == exact_title:
-                    combined_df = _b365_extract_market_df(mg, "Over_Under_RAW")
-
-                if over_df is not None and under_df is not None:
-                    break
-
-            if over_df is None and under_df is None and combined_df is not None:
-                # Split combined card into Over/Under halves by number of names/cells
-                names = combined_df["Player"].tolist()
-                mg_combined = next((mg for mg in market_groups if _title_of(mg) == exact_title), None)
-                if mg_combined:
-                    cells = _b365_extract_cells(mg_combined)
-                    N = len(names)
-                    if N and len(cells) >= 2 * N:
-                        over_cells = cells[:N]
-                        under_cells = cells[N:2 * N]
-                        over_df = pd.DataFrame({
-                            "Player": names,
-                            "Over": [f"Over {h} {o}".strip() for (h, o) in over_cells]
-                        })
-                        under_df = pd.DataFrame({
-                            "Player": names,
-                            "Under": [f"Under {h} {o}".strip() for (h, o) in under_cells]
-                        })
-
-            if over_df is not None and "Over" in over_df.columns and under_df is not None and "Under" in under_df.columns:
-                merged = pd.merge(over_df, under_df, on="Player", how="inner")
-            elif over_df is not None:
-                merged = over_df.copy(); merged["Under"] = ""
-            elif under_df is not None:
-                merged = under_df.copy(); merged["Over"] = ""
-            else:
-                merged = pd.DataFrame(columns=["Player", "Over", "Under"])
-
-            out[key_name] = merged[["Player", "Over", "Under"]]
-
-        return out
-
-    except FileNotFoundError:
-        print(f"Error: The file at {file_path} was not found.")
-        return {}
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return {}
-
-# =========================================================
-# 2) BETWAY SCRAPING — paired-row table layout
-#    Returns dict of DataFrames keyed by exact section title strings:
-#       "Player To Have 1+ Shots", "Player To Have 2+ Shots", ...,
-#       "Player To Have 1+ Shots On Target", ...
-# =========================================================
+    span = outcome = None
+    for tag in td.descendants:
+        if not isinstance(tag, Tag):
+            continue
+        testid = tag.get("data-testid")
+        if testid == "outcome-price-value" and span is None:
+            span = tag
+            text = span.get_text(strip=True)
+            if text:
+                return text
+        elif testid == "outcome" and outcome is None:
+            outcome = tag
+        if span is not None and outcome is not None:
+            break
+
+    if outcome is not None and outcome.has_attr("data-outcomename"):
+        m = _OUTCOME_FRACTION_RE.search(outcome["data-outcomename"])
+        if m:
+            return m.group(1)
+    return ""
+
+def _betway_header_title(tag, section):
+    """True for a table-header-title inside a table-header (within `section`)."""
+    for parent in tag.parents:
+        if parent is section:
+            return False
+        if parent.get("data-testid") == "table-header":
+            return True
+    return False
+
+def _betway_section_parts(section):
+    """One walk over a section: (first "Player To Have" header title, first table), stopping once both are found."""
+    title = table = None
+    for tag in section.descendants:
+        if not isinstance(tag, Tag):
+            continue
+        if tag.name == "table":
+            if table is None:
+                table = tag
+        elif title is None and tag.get("data-testid") == "table-header-title" and _betway_header_title(tag, section):
+            title = tag.get_text(strip=True)
+            if not title.startswith("Player To Have"):
+                title = None
+        if title is not None and table is not None:
+            break
+    return title, table
+
+def _betway_sections(soup):
+    """(section title, table) for every "Player To Have" market-table-section (table may be None)."""
+    for section in soup.find_all(attrs=_SECTION_ATTRS):
+        title, table = _betway_section_parts(section)
+        if title is not None:
+            yield title, table
+
+def _betway_rows(table):
+    """Stream (player, odds) from the paired layout: a row of two names, then a row of their two odds."""
+    rows = [tr for tbody in table.find_all("tbody") for tr in tbody.find_all("tr", recursive=False)]
+    for i in range(0, len(rows), 2):
+        name_cells = rows[i].find_all("td")
+        odds_cells = rows[i + 1].find_all("td") if i + 1 < len(rows) else []
+        for j in range(min(len(name_cells), 2)):
+            name = name_cells[j].get_text(strip=True)
+            odds = _betway_extract_price(odds_cells[j]) if name and j < len(odds_cells) else ""
+            if name and odds:
+                yield name, odds
+
+def _betway_section_prices(section_title, table):
+    market = _betway_market(section_title)
+    if market is None or table is None:
+        return
+    stat, k = market
+    for player, odds in _betway_rows(table):
+        yield stat, player.strip(), k, odds
+
+def betway_prices(soup):
+    """Stream (stat, player, k, odds) for every registered "Player To Have N+ ..." section."""
+    for section_title, table in _betway_sections(soup):
+        yield from _betway_section_prices(section_title, table)
 
 def scrape_betway(html_file_path):
-    with open(html_file_path, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f.read(), "html.parser")
+    soup = load_soup(html_file_path, parse_only=BETWAY_PARSE_ONLY)
 
     dataframes = {}
-
-    # Each market has a header: [data-testid="table-header-title"]
-    for header in soup.select('[data-testid="table-header"] [data-testid="table-header-title"]'):
-        section_title = header.get_text(strip=True)
-        if not section_title.startswith("Player To Have"):
-            continue
-
-        # Table lives in the same market-table-section
-        section = header.find_parent(attrs={"data-testid": "market-table-section"})
-        if not section:
+    for section_title, table in _betway_sections(soup):
+        if table is None:
             continue
-        table = section.select_one("table")  # class names change; tag stays table
-        if not table:
-            continue
-
-        rows = table.select("tbody > tr")
-        players, actions, odds = [], [], []
-
-        i = 0
-        while i < len(rows):
-            # Row of two names
-            name_cells = rows[i].select("td")
-            left_name = name_cells[0].get_text(strip=True) if len(name_cells) >= 1 else ""
-            right_name = name_cells[1].get_text(strip=True) if len(name_cells) >= 2 else ""
-
-            # Next row: two odds buttons
-            left_odds = right_odds = ""
-            if i + 1 < len(rows):
-                odds_cells = rows[i+1].select("td")
-
-                def extract_price(td):
-                    # Prefer explicit price span
-                    span = td.select_one('[data-testid="outcome-price-value"]')
-                    if span and span.get_text(strip=True):
-                        return span.get_text(strip=True)
-                    # Fallback to attribute (e.g., "Callum Wilson 3/8")
-                    btn = td.select_one('[data-testid="outcome"]')
-                    if btn and btn.has_attr("data-outcomename"):
-                        m = re.search(r'(\d+/\d+)', btn["data-outcomename"])
-                        if m:
-                            return m.group(1)
-                    return ""
-
-                if len(odds_cells) >= 1:
-                    left_odds = extract_price(odds_cells[0])
-                if len(odds_cells) >= 2:
-                    right_odds = extract_price(odds_cells[1])
-
-            # Append valid pairs
-            if left_name and left_odds:
-                players.append(left_name); actions.append(section_title); odds.append(left_odds)
-            if right_name and right_odds:
-                players.append(right_name); actions.append(section_title); odds.append(right_odds)
-
-            i += 2  # advance to next pair
-
-        df = pd.DataFrame({"Player Name": players, "Action": actions, "Odds": odds})
-        dataframes[section_title] = df
+        rows = list(_betway_rows(table))
+        dataframes[section_title] = pd.DataFrame({
+            "Player Name": [player for player, _ in rows],
+            "Action": [section_title] * len(rows),
+            "Odds": [odds for _, odds in rows],
+        })
 
     return dataframes
 
 # =========================================================
-# 3) ARBITRAGE HELPERS (unchanged math; safer parsing)
+# 2) ARBITRAGE SCAN
+#    Strategy: Bet365 "Under X.5" vs Betway "Player To Have N+ <stat>" for every
+#    stat in the market registry (markets.py)
+#    Both sides are normalized to (player, market key) and joined in arb_engine,
+#    within a market and across related ones (Under SOT vs N+ Shots);
+#    the arb test is exact integer arithmetic on the parsed prices (odds.py).
+#    bet365's Over column is not scanned here: Betway quotes no Unders to pair
+#    it with. The reverse direction (bet365 Over vs another book's Under) comes
+#    only from combined_all_bet365's best-price scan.
+#    Returns a list of opportunity dicts (same columns as the index.html table)
 # =========================================================
 
-def multiply_fractions(fraction1, fraction2):
-    try:
-        frac1 = Fraction(fraction1)
-        frac2 = Fraction(fraction2)
-        return frac1 * frac2
-    except Exception:
-        return None
-
-def fractional_to_decimal(fraction):
-    if fraction.upper().startswith("EV"):
-        return 2.0
-    num, denom = map(int, fraction.split("/"))
-    return 1 + (num / denom)
-
-def calculate_arbitrage_roi(stake, odds1, odds2):
-    d1 = fractional_to_decimal(odds1)
-    d2 = fractional_to_decimal(odds2)
-    stake1 = (d2 / (d1 + d2)) * stake
-    stake2 = stake - stake1
-    payout = stake1 * d1
-    total_profit = payout - stake
-    roi = (total_profit / stake) * 100
-    return roi, stake1, stake2, total_profit
-
-# Parse "Under 0.5 4/6" (or "Under 1.5 EVS")
-def parse_under_parts(under_text: str):
-    m_num = re.search(r"(\d+(?:\.\d+)?)", under_text)
-    m_frac = re.search(r"(\d+/\d+|EVS|Evens|EVENS)", under_text, flags=re.I)
-    if not m_num or not m_frac:
-        return None, None
-    thresh = float(m_num.group(1))
-    frac = m_frac.group(1)
-    if frac.upper().startswith("EV"):
-        frac = "1/1"
-    return thresh, frac
-
-# =========================================================
-# 4) RUN SCRAPERS
-# =========================================================
-bet365_dataframes = scrape_bet365(bet365_file_path)
-print("Bet365 Data:")
-for section_name, df in bet365_dataframes.items():
-    print(section_name)
-    print(df.head(30))
-    print("\n" + "=" * 50 + "\n")
+def betway_quotes(betway_dataframes):
+    """Betway "Player To Have N+ ..." sections as one Over quote table (see arb_engine)."""
+    parts = []
+    for section_title, df in betway_dataframes.items():
+        market = _betway_market(section_title)
+        if market is None or df.empty:
+            continue
+        stat, k = market
+        parts.append(pd.DataFrame({
+            "Player": df["Player Name"].str.strip().values,
+            "Stat": stat,
+            "K": k,
+            "Odds": df["Odds"].values,
+            "Bookmaker": "Betway",
+        }))
+    return over_quotes(parts)
+
+# Per-card extraction for incremental rescans (see incremental.py):
+# every "Player To Have N+ ..." table is one card keyed by its section title
+def betway_cards(soup):
+    yield from _betway_sections(soup)
+
+def betway_card_quotes(section_title, table):
+    return [
+        Quote(player, stat, k, k - 0.5, odds, "Over", "Betway")
+        for stat, player, k, odds in _betway_section_prices(section_title, table)
+    ]
 
-betway_dataframes = scrape_betway(betway_file_path)
-print("Betway Data:")
-for section_name, df in betway_dataframes.items():
-    print(section_name)
-    print(df.head(30))
-    print("\n" + "-" * 80 + "\n")
+def find_betway_arbitrage(bet365_dataframes, betway_dataframes, stake=100):
+    opportunities = find_all_arbitrage(bet365_under_quotes(bet365_dataframes), betway_quotes(betway_dataframes), stake)
+    return opportunities.to_dict("records")
 
 # =========================================================
-# 5) ARBITRAGE SCAN
-#    Strategy: Bet365 "Under X.5" vs Betway "Player To Have N+ Shots(/On Target)"
+# 3) RUN
 # =========================================================
 
-# --- Shots On Target ---
-if "Player_Shots_On_Target" in bet365_dataframes:
-    bet365_player_shots_on_target = bet365_dataframes["Player_Shots_On_Target"]
-    for _, row in bet365_player_shots_on_target.iterrows():
-        player_name = row['Player']
-        under_odds_text = row['Under']
-        if not isinstance(under_odds_text, str) or not under_odds_text:
-            continue
-
-        thresh, fractional_odds = parse_under_parts(under_odds_text)
-        if thresh is None or fractional_odds is None:
-            continue
-
-        rounded_up_number = int(np.ceil(thresh))
-        target_section = f"Player To Have {rounded_up_number}+ Shots On Target"
-
-        betway_df = betway_dataframes.get(target_section)
-        if betway_df is None or betway_df.empty:
-            continue
-
-        # exact name match after stripping whitespace
-        match = betway_df.loc[betway_df['Player Name'].str.strip() == player_name]
-        if match.empty:
-            continue
-
-        betway_fractional = match.iloc[0]['Odds']
-        product_fraction = multiply_fractions(fractional_odds, betway_fractional)
-
-        if product_fraction and product_fraction > 1:
-            roi, stake1, stake2, total_profit = calculate_arbitrage_roi(100, fractional_odds, betway_fractional)
-            print(f"ARBITRAGE OPPORTUNITY! - Shots On Target")
-            print(f"Player: {player_name}")
-            print(f"Bet365 'Under' Odds: {fractional_odds}")
-            print(f"Betway Odds: {betway_fractional}")
-            print(f"Guaranteed ROI: {roi:.2f}%")
-            print(f"Suggested bet on Bet365: £{stake1:.2f}")
-            print(f"Suggested bet on Betway: £{stake2:.2f}")
-            print(f"Total Profit with £100 wallet: £{total_profit:.2f}")
-            print("-" * 40)
-
-# --- Total Shots ---
-if "Player_Total_Shots" in bet365_dataframes:
-    bet365_player_total_shots = bet365_dataframes["Player_Total_Shots"]
-    for _, row in bet365_player_total_shots.iterrows():
-        player_name = row['Player']
-        under_odds_text = row['Under']
-        if not isinstance(under_odds_text, str) or not under_odds_text:
-            continue
-
-        thresh, fractional_odds = parse_under_parts(under_odds_text)
-        if thresh is None or fractional_odds is None:
-            # Optional debug:
-            # print(f"Error parsing Under odds for Player: {player_name}, Odds: {under_odds_text}")
-            continue
-
-        rounded_up_number = int(np.ceil(thresh))
-        target_section = f"Player To Have {rounded_up_number}+ Shots"
-
-        betway_df = betway_dataframes.get(target_section)
-        if betway_df is None or betway_df.empty:
-            continue
-
-        match = betway_df.loc[betway_df['Player Name'].str.strip() == player_name]
-        if match.empty:
-            continue
-
-        betway_fractional = match.iloc[0]['Odds']
-        product_fraction = multiply_fractions(fractional_odds, betway_fractional)
-
-        if product_fraction and product_fraction > 1:
-            roi, stake1, stake2, total_profit = calculate_arbitrage_roi(100, fractional_odds, betway_fractional)
-            print(f"ARBITRAGE OPPORTUNITY! - Shots")
-            print(f"Player: {player_name}")
-            print(f"Bet365 'Under' Odds: {fractional_odds}")
-            print(f"Betway Odds: {betway_fractional}")
-            print(f"Guaranteed ROI: {roi:.2f}%")
-            print(f"Suggested Bet on Bet365: £{stake1:.2f}")
-            print(f"Suggested Bet on Betway: £{stake2:.2f}")
-            print(f"Total Profit with £100 wallet: £{total_profit:.2f}")
-            print("-" * 40)
+if __name__ == "__main__":
+    from combined_all_bet365 import print_opportunity  # combined_all imports this module
+
+    bet365_dataframes = scrape_bet365(bet365_file_path)
+    print("Bet365 Data:")
+    for section_name, df in bet365_dataframes.items():
+        print(section_name)
+        print(df.head(30))
+        print("\n" + "=" * 50 + "\n")
+
+    betway_dataframes = scrape_betway(betway_file_path)
+    print("Betway Data:")
+    for section_name, df in betway_dataframes.items():
+        print(section_name)
+        print(df.head(30))
+        print("\n" + "-" * 80 + "\n")
+
+    for opp in find_betway_arbitrage(bet365_dataframes, betway_dataframes):
+        print_opportunity(opp)
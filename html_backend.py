@@ -0,0 +1,91 @@
+# html_backend.py
+#
+# One place to choose the HTML parser used by every scraper.
+#   - "html.parser": pure-Python stdlib parser (slowest, always available)
+#   - "lxml":        libxml2 C parser (fastest BeautifulSoup tree builder)
+#   - "html5lib":    browser-exact but slow; handy when a page parses oddly
+#
+# Pick one with the ARB_HTML_PARSER environment variable or set_html_parser().
+# If the chosen backend is not installed we fall back to "html.parser".
+#
+# Each bookmaker adapter also declares a SoupStrainer for the market subtrees
+# it reads; only those subtrees are built. Set ARB_FULL_DOM=1 (or
+# STRAIN_MARKETS = False) to build the whole page when debugging a layout change.
+
+import os
+import sys
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+HTML_PARSERS = ("html.parser", "lxml", "html5lib")
+
+HTML_PARSER = os.environ.get("ARB_HTML_PARSER", "html.parser")
+
+STRAIN_MARKETS = os.environ.get("ARB_FULL_DOM", "") != "1"
+
+_warned = set()
+
+def set_html_parser(name: str):
+    global HTML_PARSER
+    if name not in HTML_PARSERS:
+        raise ValueError(f"Unknown HTML parser {name!r}; choose one of {HTML_PARSERS}")
+    HTML_PARSER = name
+
+def available_parsers():
+    """Backends from HTML_PARSERS that are importable in this environment."""
+    out = []
+    for name in HTML_PARSERS:
+        try:
+            BeautifulSoup("<p></p>", name)
+        except FeatureNotFound:
+            continue
+        out.append(name)
+    return out
+
+class AnyOf(SoupStrainer):
+    """
+    parse_only filter that keeps a top-level subtree when any of the given
+    strainers would keep it, e.g. market titles *and* the blocks that follow them.
+    """
+    def __init__(self, *strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    # bs4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(s.allow_tag_creation(nsprefix, name, attrs) for s in self.strainers)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # bs4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        for s in self.strainers:
+            found = s.search_tag(markup_name, markup_attrs)
+            if found:
+                return found
+        return None
+
+    def search(self, markup):
+        return None if isinstance(markup, str) else super().search(markup)
+
+def parse_html(markup, parser=None, parse_only=None):
+    """
+    BeautifulSoup(markup) with the configured backend (or `parser` if given).
+    `parse_only` is a SoupStrainer limiting the tree to the subtrees it matches.
+    """
+    parser = parser or HTML_PARSER
+    if not STRAIN_MARKETS or parser == "html5lib":
+        # html5lib always builds the full tree
+        parse_only = None
+    try:
+        return BeautifulSoup(markup, parser, parse_only=parse_only)
+    except FeatureNotFound:
+        if parser not in _warned:
+            print(f"HTML parser {parser!r} is not installed; falling back to 'html.parser'.", file=sys.stderr)
+            _warned.add(parser)
+        return BeautifulSoup(markup, "html.parser", parse_only=parse_only)
+
+def load_soup(file_path, parser=None, parse_only=None):
+    """Read a saved page (UTF-8) and parse it with the configured backend."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return parse_html(f.read(), parser, parse_only)
@@ -0,0 +1,164 @@
+# incremental.py
+#
+# Per-card incremental rescans of re-saved bookmaker pages.
+# When a page is saved again usually only a few market cards have new prices,
+# so every card is fingerprinted:
+#   - bet365:       each gl-MarketGroup holding a market's Over and/or Under prices
+#   - Betway:       each "Player To Have N+ ..." section's table
+#   - Sky Bet:      each -gridRunnerLine (one player in one market)
+#   - William Hill: each btmarket__selection (one player/threshold)
+# Only cards whose fingerprint changed are re-extracted. The rescan returns a
+# QuoteDelta (quotes added / removed) and IncrementalScanner re-evaluates only
+# the (player, stat) pairs that delta touches, together with the stats related
+# to them through arb_engine.STAT_DOMINANCE.
+
+from __future__ import annotations
+
+import hashlib
+from collections import defaultdict
+
+from arb_engine import (
+    OPPORTUNITY_COLUMNS, STAT_LABELS, dominating_stats, market_label, scan_quotes,
+)
+from bet365_scraper import BET365_PARSE_ONLY, bet365_cards, bet365_card_quotes
+from combined_betway_bet365 import BETWAY_PARSE_ONLY, betway_cards, betway_card_quotes
+from combined_sky_bet365 import SKYBET_PARSE_ONLY, skybet_cards, skybet_card_quotes
+from combined_wh_bet365 import WH_PARSE_ONLY, williamhill_cards, williamhill_card_quotes
+from html_backend import load_soup
+from lazy import lazy_module
+from players import player_id
+
+pd = lazy_module("pandas")
+
+# bookmaker -> (parse_only strainer, card iterator, card -> [Quote])
+CARD_ADAPTERS = {
+    "Bet365":       (BET365_PARSE_ONLY, bet365_cards,      bet365_card_quotes),
+    "Betway":       (BETWAY_PARSE_ONLY, betway_cards,       betway_card_quotes),
+    "SkyBet":       (SKYBET_PARSE_ONLY, skybet_cards,      skybet_card_quotes),
+    "William Hill": (WH_PARSE_ONLY,     williamhill_cards, williamhill_card_quotes),
+}
+
+# Market label -> stat of the Under leg (cross-market labels included)
+_STAT_OF_MARKET = {label: stat for stat, label in STAT_LABELS.items()}
+_RELATED_STATS = {}
+for _lower, _highers in dominating_stats().items():
+    for _higher in _highers:
+        _STAT_OF_MARKET[market_label(_lower, _higher)] = _lower
+        _RELATED_STATS.setdefault(_lower, set()).add(_higher)
+        _RELATED_STATS.setdefault(_higher, set()).add(_lower)
+
+def card_fingerprint(card) -> bytes:
+    """Hash of the card's markup: any price, label or attribute change alters it."""
+    return hashlib.blake2b(str(card).encode("utf-8"), digest_size=16).digest()
+
+def pair_key(player, stat):
+    """(player ID, stat) pair a quote or opportunity belongs to."""
+    return player_id(player), stat
+
+def opportunity_pair(opp):
+    """(player ID, Under stat) pair an opportunity dict belongs to."""
+    return pair_key(opp["Player"], _STAT_OF_MARKET.get(opp["Market"], opp["Market"]))
+
+class QuoteDelta:
+    """Quotes that appeared or disappeared in one rescan of one bookmaker page."""
+
+    def __init__(self, bookmaker, added, removed, cards_changed, cards_total):
+        self.bookmaker = bookmaker
+        self.added = added
+        self.removed = removed
+        self.cards_changed = cards_changed
+        self.cards_total = cards_total
+
+    @property
+    def affected(self):
+        return {pair_key(q.Player, q.Stat) for q in self.added + self.removed}
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    def __repr__(self):
+        return (f"QuoteDelta({self.bookmaker}: +{len(self.added)} -{len(self.removed)} quotes, "
+                f"{self.cards_changed}/{self.cards_total} cards changed)")
+
+class CardSnapshot:
+    """Fingerprints and extracted quotes for every card of one bookmaker's saved page."""
+
+    def __init__(self, bookmaker):
+        if bookmaker not in CARD_ADAPTERS:
+            raise ValueError(f"No per-card adapter for {bookmaker!r}; choose one of {list(CARD_ADAPTERS)}")
+        self.bookmaker = bookmaker
+        self.cards = {}  # card key -> (fingerprint, [Quote])
+
+    def quotes(self):
+        return [q for _, quotes in self.cards.values() for q in quotes]
+
+    def rescan(self, file_path) -> QuoteDelta:
+        """Parse the page, re-extract only changed cards and return what moved."""
+        parse_only, iter_cards, extract = CARD_ADAPTERS[self.bookmaker]
+        soup = load_soup(file_path, parse_only=parse_only)
+
+        current = {}
+        added, removed = [], []
+        changed = 0
+        for key, card in iter_cards(soup):
+            if key in current:  # repeated key: first card wins, as in the full scrapers
+                continue
+            fingerprint = card_fingerprint(card)
+            previous = self.cards.get(key)
+            if previous is not None and previous[0] == fingerprint:
+                current[key] = previous
+                continue
+            quotes = extract(key, card)
+            current[key] = (fingerprint, quotes)
+            changed += 1
+            old = set(previous[1]) if previous else set()
+            new = set(quotes)
+            added.extend(q for q in quotes if q not in old)
+            removed.extend(q for q in (previous[1] if previous else []) if q not in new)
+
+        for key, (_, quotes) in self.cards.items():
+            if key not in current:  # card gone from the page
+                removed.extend(quotes)
+                changed += 1
+
+        self.cards = current
+        return QuoteDelta(self.bookmaker, added, removed, changed, len(current))
+
+class IncrementalScanner:
+    """
+    All current quotes, indexed by (player, stat), and the opportunities they
+    produce. apply(delta) re-runs the scan for the touched pairs only.
+    """
+
+    def __init__(self, stake=100):
+        self.stake = stake
+        self.quotes = defaultdict(set)  # (player, stat) -> {Quote}
+        self.found = {}                 # (player, stat) -> [opportunity dict]
+        self.affected = set()           # pairs the last apply() re-evaluated
+
+    def apply(self, delta: QuoteDelta) -> list:
+        """Fold a delta in; returns the re-evaluated opportunity dicts for the affected pairs."""
+        for q in delta.removed:
+            self.quotes[pair_key(q.Player, q.Stat)].discard(q)
+        for q in delta.added:
+            self.quotes[pair_key(q.Player, q.Stat)].add(q)
+
+        # A changed SOT quote can open or close a cross-market pair with shots
+        affected = delta.affected
+        affected |= {(player, related) for player, stat in affected for related in _RELATED_STATS.get(stat, ())}
+        for key in affected:
+            self.found.pop(key, None)
+            if not self.quotes.get(key):
+                self.quotes.pop(key, None)
+
+        legs = [q for key in affected for q in self.quotes.get(key, ())]
+        fresh = scan_quotes(legs, self.stake)
+        for opp in fresh:
+            self.found.setdefault(opportunity_pair(opp), []).append(opp)
+        self.affected = affected
+        return fresh
+
+    def opportunities(self) -> pd.DataFrame:
+        rows = [opp for opps in self.found.values() for opp in opps]
+        df = pd.DataFrame(rows, columns=OPPORTUNITY_COLUMNS)
+        return df.sort_values("ROI", ascending=False, ignore_index=True) if not df.empty else df
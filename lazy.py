@@ -0,0 +1,28 @@
+# lazy.py
+#
+# Deferred import for pandas (or any heavy module).
+#     pd = lazy_module("pandas")
+# binds a stand-in; the real module is imported on the first attribute access
+# (pd.DataFrame, pd.concat, ...). Code paths that stay on Quote records and
+# arb_engine.scan_quotes (see quick_scan.py) never import pandas at all.
+# Modules using it need `from __future__ import annotations` if they annotate
+# with pd.DataFrame, so signatures don't trigger the import.
+
+import importlib
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_module(name) -> LazyModule:
+    return LazyModule(name)
@@ -0,0 +1,87 @@
+# markets.py
+#
+# Declarative market registry shared by every scraper and the arbitrage engine.
+# One entry per stat: its key, label, the "k+" noun used in action labels and
+# the exact market title on each bookmaker's page.
+#
+# Every quote is reduced to an integer market key
+#     market_key(stat, k) = STAT_IDS[stat] << 8 | k
+# where k is the smallest count the Over leg wins with (the Under leg loses
+# with), so Unders and Overs of all four stats match on (player, market key).
+# Thresholds are normalized here and nowhere else:
+#     "Under X"  (line)        -> k = ceil(X)        Under 1.5 -> 2
+#     "Over X"   (line)        -> k = floor(X) + 1   Over 1.5  -> 2
+#     "At Least n" / "n+"      -> k = n
+#     "Over n"   (whole count) -> k = n + 1          WH "Over 2 Shots" -> 3
+#     Sky grid column i (1-based: 1+, 2+, ...) -> k = i
+
+from collections import namedtuple
+
+import numpy as np
+
+Market = namedtuple("Market", ["stat", "label", "noun", "titles"])
+
+# Adjust a title here if a bookmaker renames a market on its page
+MARKETS = [
+    Market("Player_Shots_On_Target", "Shots On Target", "Shots On Target", {
+        "Bet365":       "Player Shots On Target Over/Under",
+        "Betway":       "Shots On Target",          # "Player To Have N+ Shots On Target"
+        "SkyBet":       "Player Shots On Target",
+        "William Hill": "Player Shots on Target",
+    }),
+    Market("Player_Total_Shots", "Total Shots", "Shots", {
+        "Bet365":       "Player Shots Over/Under",
+        "Betway":       "Shots",
+        "SkyBet":       "Player Total Shots",
+        "William Hill": "Total Player Shots",
+    }),
+    Market("Player_Fouls_Committed", "Fouls Committed", "Fouls", {
+        "Bet365":       "Player Fouls Over/Under",
+        "Betway":       "Fouls Committed",
+        "SkyBet":       "Player Fouls Committed",
+        "William Hill": "Player Fouls",
+    }),
+    Market("Player_Tackles", "Tackles", "Tackles", {
+        "Bet365":       "Player Tackles Over/Under",
+        "Betway":       "Tackles",
+        "SkyBet":       "Player Tackles",
+        "William Hill": "Total Player Tackles",
+    }),
+]
+
+STAT_IDS = {m.stat: i for i, m in enumerate(MARKETS, start=1)}
+STAT_LABELS = {m.stat: m.label for m in MARKETS}
+STAT_NOUNS = {m.stat: m.noun for m in MARKETS}
+
+_K_BITS = 8  # k < 256
+
+def market_titles(bookmaker) -> dict:
+    """stat -> exact market title on `bookmaker`'s page."""
+    return {m.stat: m.titles[bookmaker] for m in MARKETS if bookmaker in m.titles}
+
+def market_key(stat, k) -> int:
+    return STAT_IDS[stat] << _K_BITS | int(k)
+
+def market_keys(stats, ks) -> np.ndarray:
+    """Vectorized market_key; unregistered stats get key 0 for k and never match."""
+    ids = np.fromiter((STAT_IDS.get(s, 0) for s in stats), dtype=np.int64, count=len(stats))
+    return np.where(ids > 0, (ids << _K_BITS) | np.asarray(ks, dtype=np.int64), 0)
+
+# ---------------------------------------------------------
+# Threshold normalization (scalars or NumPy arrays)
+# ---------------------------------------------------------
+
+def k_under_line(line):
+    return np.ceil(line).astype(int)
+
+def k_over_line(line):
+    return np.floor(line).astype(int) + 1
+
+def k_at_least(n):
+    return n
+
+def k_over_count(n):
+    return n + 1
+
+def k_column(i):
+    return i
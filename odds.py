@@ -0,0 +1,145 @@
+# odds.py
+#
+# Fractional odds kept as integers.
+# A price "a/b" is stored as (num=a, den=b); EVS/Evens is 1/1.
+# Two legs a/b (Under) and c/d (Over) are an arbitrage exactly when
+#     a·c > b·d
+# (the product of the fractional odds exceeds 1), so the decision never goes
+# through floats or Fraction objects. Stakes and ROI are derived from the
+# same integers:
+#     under stake = stake · b(c+d) / Q,   Q = d(a+b) + b(c+d)
+#     ROI         = (a·c − b·d) / Q · 100
+
+import re
+import threading
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+
+_FRACTION_RE = re.compile(r"(\d+)\s*/\s*(\d+)|\b(EVS|EVENS)\b", re.I)
+
+def parse_fraction(text):
+    """First price in `text` as (num, den): "Under 0.5 4/6" -> (4, 6), "EVS" -> (1, 1). None if absent."""
+    if not isinstance(text, str):
+        return None
+    m = _FRACTION_RE.search(text)
+    if not m:
+        return None
+    if m.group(3):
+        return 1, 1
+    num, den = int(m.group(1)), int(m.group(2))
+    return (num, den) if den else None
+
+# =========================================================
+# UK ODDS LADDER
+#    Every price gets a small integer ID (0 = no/unreadable price) with
+#    precomputed numerator, denominator, decimal odds and implied probability.
+#    Quotes are stored as uint16 IDs and converted by table lookup:
+#        PRICE_NUM[ids], PRICE_DEN[ids], PRICE_DECIMAL[ids], PRICE_IMPLIED[ids]
+#    Prices not on the ladder are parsed once (memoized) and appended.
+# =========================================================
+
+UK_LADDER = (
+    "1/100", "1/66", "1/50", "1/40", "1/33", "1/28", "1/25", "1/22", "1/20", "1/18",
+    "1/16", "1/14", "1/12", "1/11", "1/10", "1/9", "1/8", "2/15", "1/7", "2/13",
+    "1/6", "2/11", "1/5", "2/9", "1/4", "2/7", "3/10", "1/3", "7/20", "4/11",
+    "3/8", "2/5", "5/12", "4/9", "9/20", "1/2", "8/15", "4/7", "3/5", "8/13",
+    "5/8", "4/6", "8/11", "5/7", "3/4", "4/5", "5/6", "10/11", "1/1", "21/20",
+    "11/10", "6/5", "5/4", "13/10", "11/8", "7/5", "29/20", "6/4", "8/5", "13/8",
+    "17/10", "7/4", "9/5", "15/8", "19/10", "2/1", "21/10", "85/40", "11/5", "9/4",
+    "23/10", "12/5", "5/2", "13/5", "11/4", "14/5", "3/1", "16/5", "10/3", "7/2",
+    "18/5", "4/1", "9/2", "5/1", "11/2", "6/1", "13/2", "7/1", "15/2", "8/1",
+    "17/2", "9/1", "10/1", "11/1", "12/1", "14/1", "16/1", "18/1", "20/1", "22/1",
+    "25/1", "28/1", "33/1", "40/1", "50/1", "66/1", "80/1", "100/1", "125/1", "150/1",
+    "200/1", "250/1", "300/1", "500/1", "1000/1",
+)
+
+_LADDER_CAPACITY = 1 << 16  # IDs fit in uint16
+
+PRICE_NUM = np.zeros(_LADDER_CAPACITY, dtype=np.int64)
+PRICE_DEN = np.zeros(_LADDER_CAPACITY, dtype=np.int64)
+PRICE_DECIMAL = np.full(_LADDER_CAPACITY, np.nan)
+PRICE_IMPLIED = np.full(_LADDER_CAPACITY, np.nan)
+PRICE_TEXT = [""]      # id -> canonical "a/b"
+
+PRICE_IDS = {}         # ladder spelling -> id
+_RATIONAL_IDS = {}     # reduced (num, den) -> id
+
+_register_lock = threading.Lock()  # pipeline.py stages register prices from several threads
+
+def _register(num: int, den: int) -> int:
+    g = gcd(num, den) or 1
+    key = (num // g, den // g)
+    pid = _RATIONAL_IDS.get(key)
+    if pid is not None:
+        return pid
+    with _register_lock:
+        pid = _RATIONAL_IDS.get(key)
+        if pid is not None:
+            return pid
+        pid = len(PRICE_TEXT)
+        if pid >= _LADDER_CAPACITY:
+            raise OverflowError("odds ladder is full")
+        PRICE_NUM[pid], PRICE_DEN[pid] = num, den
+        PRICE_DECIMAL[pid] = 1 + num / den
+        PRICE_IMPLIED[pid] = den / (num + den)
+        PRICE_TEXT.append(f"{num}/{den}")
+        _RATIONAL_IDS[key] = pid
+        return pid
+
+for _price in UK_LADDER:
+    _num, _den = map(int, _price.split("/"))
+    PRICE_IDS[_price] = _register(_num, _den)
+for _alias in ("EVS", "Evs", "evs", "EVENS", "Evens", "evens"):
+    PRICE_IDS[_alias] = PRICE_IDS["1/1"]
+
+@lru_cache(maxsize=4096)
+def _parse_price_id(text: str) -> int:
+    parsed = parse_fraction(text)
+    return _register(*parsed) if parsed else 0
+
+def price_id(text) -> int:
+    """Ladder ID for a price string ("4/6", "EVS", " 10/11 "); 0 if unreadable."""
+    if not isinstance(text, str):
+        return 0
+    pid = PRICE_IDS.get(text)
+    if pid is None:
+        pid = PRICE_IDS.get(text.strip())
+    return pid if pid is not None else _parse_price_id(text.strip())
+
+def price_ids(odds) -> np.ndarray:
+    """Column of price strings -> uint16 ladder IDs (0 where unreadable)."""
+    return np.fromiter((price_id(o) for o in odds), dtype=np.uint16, count=len(odds))
+
+def is_arbitrage(under_num, under_den, over_num, over_den):
+    """Element-wise exact test a·c > b·d (works on scalars or NumPy arrays)."""
+    return (np.asarray(under_num) * over_num) > (np.asarray(under_den) * over_den)
+
+def arbitrage_stakes(under_num, under_den, over_num, over_den, stake=100):
+    """
+    Element-wise (roi, under_stake, over_stake, total_profit) for two legs,
+    splitting `stake` so both outcomes pay the same.
+    """
+    a, b = np.asarray(under_num, dtype=np.int64), np.asarray(under_den, dtype=np.int64)
+    c, d = np.asarray(over_num, dtype=np.int64), np.asarray(over_den, dtype=np.int64)
+    q = d * (a + b) + b * (c + d)
+    under_stake = stake * (b * (c + d)) / q
+    edge = (a * c - b * d) / q
+    return edge * 100, under_stake, stake - under_stake, edge * stake
+
+# ---------------------------------------------------------
+# Scalar helpers for single price strings
+# ---------------------------------------------------------
+
+def fractional_to_decimal(frac):
+    pid = price_id(frac)
+    return float(PRICE_DECIMAL[pid]) if pid else None
+
+def calculate_arbitrage_roi(stake, odds1, odds2):
+    """(roi, stake on odds1, stake on odds2, total_profit); all None if a price is unreadable."""
+    p1, p2 = price_id(odds1), price_id(odds2)
+    if not p1 or not p2:
+        return None, None, None, None
+    roi, stake1, stake2, total_profit = arbitrage_stakes(PRICE_NUM[p1], PRICE_DEN[p1], PRICE_NUM[p2], PRICE_DEN[p2], stake)
+    return float(roi), float(stake1), float(stake2), float(total_profit)
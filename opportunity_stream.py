@@ -0,0 +1,152 @@
+# opportunity_stream.py
+#
+# Delta stream of arbitrage opportunities, as JSON lines.
+# Instead of printing every opportunity again on each run, the combined
+# scripts (combined_all_bet365.py, batch_scan.py, watch.py) fold their results
+# into an OpportunityStore and print only what moved since the last run:
+#   {"Event": "new", "Time": 1760800000.123, "Fixture": "whubre", "Market": ..., "ROI": 2.31, ...}
+#   {"Event": "changed", ..., "ROI": 1.87, "Previous ROI": 2.31}
+#   {"Event": "vanished", ...}   (the last known numbers of the opportunity)
+# An opportunity is identified by (fixture, player ID, market, line, under
+# bookmaker, over bookmaker): the market label names the stat (and the Over
+# leg's stat for cross-market pairs), the bookmakers name the two legs. Its
+# other fields are those of OPPORTUNITY_COLUMNS.
+# The store persists between runs, so consecutive runs of a script diff
+# against each other.
+#
+#   ARB_OPPORTUNITY_STATE   store path (default: .opportunities.json next to this file)
+#   ARB_DELTA_STREAM=0      print every opportunity as a block, as before
+# With the stream on, stdout carries nothing but events: the scripts print
+# their status and error messages to LOG (stderr).
+
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from arb_engine import OPPORTUNITY_COLUMNS
+from players import player_id
+from snapshot_names import parse_snapshot_name
+
+STATE_PATH = os.environ.get("ARB_OPPORTUNITY_STATE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".opportunities.json"))
+
+DELTA_STREAM = os.environ.get("ARB_DELTA_STREAM", "1") != "0"
+LOG = sys.stderr if DELTA_STREAM else sys.stdout  # status / error messages
+ROI_TOLERANCE = 1e-6  # ROI moves (in %) up to this are not "changed"
+
+EVENTS = ("new", "changed", "vanished")
+
+def _plain(value):
+    """numpy scalars (from DataFrame rows) -> the Python values json can write."""
+    return value.item() if hasattr(value, "item") else value
+
+def opportunity_key(fixture, opp) -> tuple:
+    return (fixture, player_id(opp["Player"]), opp["Market"], float(opp["Line"]),
+            opp["Under Bookmaker"], opp["Over Bookmaker"])
+
+def fixture_name(path) -> str:
+    """Fixture of a saved page, named as batch_scan.py and watch.py name it ("whubre365.html" -> "whubre")."""
+    name = re.split(r"[\\/]", path)[-1]
+    parsed = parse_snapshot_name(name)
+    return parsed[0] if parsed else os.path.splitext(name)[0]
+
+class OpportunityStore:
+    """Last known opportunities per fixture; update() turns a new result into events."""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.fixtures = {}  # fixture -> {key: opportunity dict}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read opportunity store {self.path}: {e}", file=LOG)
+            return
+        for record in records:
+            fixture = record.get("Fixture", "")
+            self.fixtures.setdefault(fixture, {})[opportunity_key(fixture, record)] = record
+
+    def save(self):
+        """Write the store if any event was produced since the last save."""
+        if not self._dirty or not self.path:
+            return
+        records = [record for known in self.fixtures.values() for record in known.values()]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False, indent=0)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Could not write opportunity store {self.path}: {e}", file=LOG)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def update(self, opportunities, fixture="", within=None) -> list:
+        """
+        Fold in the current opportunities of `fixture` (dicts keyed by
+        OPPORTUNITY_COLUMNS) and return the new / changed / vanished events.
+        A known opportunity missing from `opportunities` has vanished; with
+        `within`, only if within(opp) is true (for a rescan that re-evaluated
+        part of the fixture, e.g. the pairs an incremental update touched).
+        """
+        now = round(time.time(), 3)
+        current = {}
+        for opp in opportunities:
+            record = {"Fixture": fixture, **{col: _plain(opp[col]) for col in OPPORTUNITY_COLUMNS}}
+            key = opportunity_key(fixture, record)
+            # A book quoting the same line twice: keep its better price
+            if key not in current or record["ROI"] > current[key]["ROI"]:
+                current[key] = record
+
+        known = self.fixtures.setdefault(fixture, {})
+        events = []
+        for key, record in current.items():
+            old = known.get(key)
+            if old is None:
+                events.append({"Event": "new", "Time": now, **record})
+            elif abs(record["ROI"] - old["ROI"]) > ROI_TOLERANCE:
+                events.append({"Event": "changed", "Time": now, **record, "Previous ROI": old["ROI"]})
+            known[key] = record
+        for key in [k for k, old in known.items() if k not in current and (within is None or within(old))]:
+            events.append({"Event": "vanished", "Time": now, **known.pop(key)})
+        if not known:
+            del self.fixtures[fixture]
+
+        if events:
+            self._dirty = True
+        return events
+
+def emit(events, out=None):
+    """Write events as JSON lines and flush, so a consumer sees each one at once."""
+    out = out or sys.stdout
+    for event in events:
+        out.write(json.dumps(event, ensure_ascii=False) + "\n")
+    out.flush()
+
+def publish(opportunities_df, fixtures, store=None) -> list:
+    """
+    Fold a full run's opportunities into the store, print the events and save.
+    `fixtures` are every fixture the run scanned, so one whose opportunities
+    all closed reports them as vanished; rows without a Fixture column belong
+    to fixtures[0].
+    """
+    store = store if store is not None else OpportunityStore()
+    by_fixture = {fixture: [] for fixture in fixtures}
+    for opp in opportunities_df.to_dict("records"):
+        by_fixture.setdefault(opp.get("Fixture", fixtures[0]), []).append(opp)
+    events = []
+    for fixture, opportunities in by_fixture.items():
+        events.extend(store.update(opportunities, fixture))
+    emit(events)
+    store.save()
+    return events
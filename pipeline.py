@@ -0,0 +1,315 @@
+# pipeline.py
+#
+# Streaming fixture pipeline: capture -> extract -> normalize -> scan.
+#   python pipeline.py <directory> [capture extract normalize scan]   (worker counts)
+# The stages run concurrently, connected by bounded queues, each with its own
+# worker count, so parsing fixture N overlaps with scanning fixture N-1:
+#   capture    saved pages (paths or file:// URLs) pass straight through; a URL
+#              is rendered on a warm wh_capture.BrowserPool session (William
+#              Hill's dropdowns expanded) and its markup saved to CAPTURE_DIR
+#   extract    scrape_* per page, each worker driving one process of a pool
+#              (parsing is GIL-bound)
+#   normalize  tables -> Over/Under quote tables (arb_engine); a fixture moves on
+#              once all its pages are in
+#   scan       find_all_arbitrage over the fixture's quotes
+# A full queue blocks the stage feeding it, so the slow stage is the one whose
+# inbox stays full. metrics() samples every queue's depth while the pipeline
+# runs and reports each stage's busy time and utilization.
+#
+#   ARB_CAPTURE_DIR   where captured pages are saved (default: .captures next to this file)
+
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import html_backend
+from arb_engine import find_all_arbitrage
+from batch_scan import BATCH_COLUMNS, _init_worker, _scrape_page, find_fixtures
+from bet365_scraper import bet365_over_quotes, bet365_under_quotes
+from combined_all_bet365 import OVER_QUOTERS, print_opportunity
+from lazy import lazy_module
+from opportunity_stream import DELTA_STREAM, LOG, publish
+from players import save_players
+from snapshot_names import BOOKMAKER_TAGS
+
+pd = lazy_module("pandas")
+
+CAPTURE_DIR = os.environ.get("ARB_CAPTURE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".captures"))
+
+STAGES = ["capture", "extract", "normalize", "scan"]
+DEFAULT_WORKERS = {"capture": 1, "extract": os.cpu_count() or 2, "normalize": 1, "scan": 1}
+
+QUEUE_SIZE = 8            # items each stage's inbox holds before its feeder blocks
+METRICS_INTERVAL = 0.01   # seconds between queue-depth samples
+
+METRICS_COLUMNS = ["Stage", "Workers", "Items", "Busy (s)", "Utilization", "Mean Queue", "Max Queue", "Full (%)"]
+
+_DONE = object()  # end-of-input marker, one per worker
+
+# bookmaker -> file-name tag for captured pages
+_CAPTURE_TAGS = {}
+for _tag, _book in BOOKMAKER_TAGS.items():
+    if len(_tag) > len(_CAPTURE_TAGS.get(_book, "")):
+        _CAPTURE_TAGS[_book] = _tag
+
+def local_path(target):
+    """Saved page path for a path or file:// URL; None for a live URL."""
+    if target.startswith("file:"):
+        return url2pathname(urlparse(target).path)
+    return None if "://" in target else target
+
+class Stage:
+    """`workers` threads running `func` on items from `inbox`; whatever func yields goes to `outbox`."""
+
+    def __init__(self, name, func, workers, inbox, outbox):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.inbox = inbox
+        self.outbox = outbox
+        self.items = 0
+        self.busy = 0.0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.full_samples = 0
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                return
+            start = time.perf_counter()
+            try:
+                outputs = list(self.func(item))
+            except Exception as e:
+                print(f"{self.name} stage failed: {e}", file=LOG)
+                outputs = []
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.items += 1
+                self.busy += elapsed
+            # Time blocked on a full outbox is backpressure, not work
+            for output in outputs:
+                self.outbox.put(output)
+
+    def finish(self, downstream_workers):
+        """Wait for every worker, then send the next stage one end marker per worker."""
+        for thread in self._threads:
+            thread.join()
+        for _ in range(downstream_workers):
+            self.outbox.put(_DONE)
+
+    def sample(self):
+        depth = self.inbox.qsize()
+        self.samples += 1
+        self.depth_total += depth
+        self.depth_max = max(self.depth_max, depth)
+        if self.inbox.maxsize and depth >= self.inbox.maxsize:
+            self.full_samples += 1
+
+class FixturePipeline:
+    """
+    fixtures: {fixture: {bookmaker: saved page path or URL}} (see batch_scan.find_fixtures).
+    workers:  per-stage worker counts, e.g. {"extract": 4}; missing stages use DEFAULT_WORKERS.
+    """
+
+    def __init__(self, fixtures: dict, stake=100, workers=None, queue_size=QUEUE_SIZE, use_cache=True):
+        self.fixtures = fixtures
+        self.stake = stake
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.queue_size = queue_size
+        self.use_cache = use_cache
+        self.stages = []
+        self.wall = 0.0
+        self._pending = {fixture: len(pages) for fixture, pages in fixtures.items()}
+        self._quotes = {fixture: {} for fixture in fixtures}
+        self._gather_lock = threading.Lock()
+        self._executor = None
+        self._browsers = None
+        self._browsers_lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # Stage functions: each yields what the next stage takes
+    # ---------------------------------------------------------
+
+    def _capture(self, item):
+        fixture, book, target = item
+        path = local_path(target)
+        if path is not None:
+            yield fixture, book, path
+            return
+        from wh_capture import BrowserPool, capture_html  # Selenium only when capturing live pages
+        with self._browsers_lock:
+            if self._browsers is None:
+                self._browsers = BrowserPool(size=self.workers["capture"])
+        try:
+            with self._browsers.session() as driver:
+                html = capture_html(driver, target, expand=book == "William Hill")
+        except Exception as e:
+            print(f"Failed to capture {fixture} {book}: {e}", file=LOG)
+            yield fixture, book, None
+            return
+        os.makedirs(CAPTURE_DIR, exist_ok=True)
+        path = os.path.join(CAPTURE_DIR, f"{fixture}_{_CAPTURE_TAGS.get(book, book)}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        yield fixture, book, path
+
+    def _extract(self, item):
+        fixture, book, path = item
+        tables = None
+        if path is not None:
+            try:
+                tables = self._executor.submit(_scrape_page, book, path, self.use_cache).result()
+            except Exception as e:
+                print(f"Failed to scrape {fixture} {book}: {e}", file=LOG)
+        yield fixture, book, tables
+
+    def _normalize(self, item):
+        fixture, book, tables = item
+        quotes = None
+        if tables is not None:
+            try:
+                if book == "Bet365":
+                    quotes = (bet365_under_quotes(tables), bet365_over_quotes(tables))
+                else:
+                    quotes = (None, OVER_QUOTERS[book](tables))
+            except Exception as e:
+                print(f"Failed to normalize {fixture} {book}: {e}", file=LOG)
+
+        with self._gather_lock:
+            if quotes is not None:
+                self._quotes[fixture][book] = quotes
+            self._pending[fixture] -= 1
+            if self._pending[fixture]:
+                return
+            books = self._quotes.pop(fixture)
+        yield fixture, books
+
+    def _scan(self, item):
+        fixture, books = item
+        if "Bet365" not in books:
+            print(f"Skipping {fixture}: no bet365 quotes", file=LOG)
+            return
+        unders = books["Bet365"][0]
+        overs = [o for _, o in books.values() if not o.empty]
+        if unders.empty or not overs:
+            return
+        found = find_all_arbitrage(unders, pd.concat(overs, ignore_index=True), self.stake)
+        for opp in found.to_dict("records"):
+            opp["Fixture"] = fixture
+            yield opp
+
+    # ---------------------------------------------------------
+    # Run
+    # ---------------------------------------------------------
+
+    def run(self) -> pd.DataFrame:
+        """Push every page through the stages; returns the opportunities ranked by ROI (BATCH_COLUMNS)."""
+        funcs = {"capture": self._capture, "extract": self._extract, "normalize": self._normalize, "scan": self._scan}
+        inboxes = [queue.Queue(self.queue_size) for _ in STAGES]
+        results = queue.Queue()  # unbounded: drained once the pipeline is done
+        self.stages = [
+            Stage(name, funcs[name], self.workers[name], inboxes[i], inboxes[i + 1] if i + 1 < len(STAGES) else results)
+            for i, name in enumerate(STAGES)
+        ]
+
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(METRICS_INTERVAL):
+                for stage in self.stages:
+                    stage.sample()
+
+        start = time.perf_counter()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers["extract"], initializer=_init_worker,
+                                             initargs=(html_backend.HTML_PARSER, html_backend.STRAIN_MARKETS))
+        sampler = threading.Thread(target=sample, name="pipeline-metrics", daemon=True)
+        try:
+            for stage in self.stages:
+                stage.start()
+            sampler.start()
+
+            for fixture, pages in self.fixtures.items():
+                for book, target in pages.items():
+                    inboxes[0].put((fixture, book, target))
+            for _ in range(self.stages[0].workers):
+                inboxes[0].put(_DONE)
+
+            for i, stage in enumerate(self.stages):
+                stage.finish(self.stages[i + 1].workers if i + 1 < len(self.stages) else 0)
+        finally:
+            stop.set()
+            self._executor.shutdown()
+            if self._browsers is not None:
+                self._browsers.close()
+            self.wall = time.perf_counter() - start
+
+        save_players()  # keep player IDs stable for the next run
+
+        opportunities = []
+        while not results.empty():
+            opportunities.append(results.get())
+        df = pd.DataFrame(opportunities, columns=BATCH_COLUMNS)
+        if not df.empty:
+            df = df.sort_values(["ROI", "Fixture"], ascending=[False, True], ignore_index=True)
+        return df
+
+    def metrics(self) -> pd.DataFrame:
+        """
+        Per stage: items processed, busy seconds, utilization (busy / workers x wall time)
+        and its inbox depth over the run. The bottleneck has the highest
+        utilization and a full inbox; the stages after it sit mostly empty.
+        """
+        rows = []
+        for stage in self.stages:
+            capacity = self.wall * stage.workers
+            rows.append({
+                "Stage": stage.name,
+                "Workers": stage.workers,
+                "Items": stage.items,
+                "Busy (s)": round(stage.busy, 3),
+                "Utilization": round(stage.busy / capacity, 2) if capacity else 0.0,
+                "Mean Queue": round(stage.depth_total / stage.samples, 2) if stage.samples else 0.0,
+                "Max Queue": stage.depth_max,
+                "Full (%)": round(100 * stage.full_samples / stage.samples, 1) if stage.samples else 0.0,
+            })
+        return pd.DataFrame(rows, columns=METRICS_COLUMNS)
+
+    def bottleneck(self) -> str:
+        """Name of the stage with the highest utilization."""
+        table = self.metrics()
+        return table.loc[table["Utilization"].idxmax(), "Stage"] if not table.empty else ""
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python pipeline.py <directory> [capture extract normalize scan]")
+    counts = [int(n) for n in sys.argv[2:]]
+    fixtures = find_fixtures(sys.argv[1])
+    pipeline = FixturePipeline(fixtures, workers=dict(zip(STAGES, counts)))
+    opportunities_df = pipeline.run()
+
+    if DELTA_STREAM:
+        publish(opportunities_df, list(fixtures))
+    else:
+        if opportunities_df.empty:
+            print("No arbitrage opportunities found.")
+        for _, opp in opportunities_df.iterrows():
+            print(f"Fixture: {opp['Fixture']}")
+            print_opportunity(opp)
+
+    print(f"\nPipeline: {pipeline.wall:.2f}s wall", file=LOG)
+    print(pipeline.metrics().to_string(index=False), file=LOG)
+    print(f"Bottleneck: {pipeline.bottleneck()}", file=LOG)
@@ -0,0 +1,238 @@
+# players.py
+#
+# Canonical player IDs.
+# Bookmakers spell the same player differently ("Ward-Prowse" / "Ward Prowse",
+# "Martin Ødegaard" / "Martin Odegaard", Sky's "Bruno Guimarães To Commit").
+# Each raw spelling is normalized once:
+#   accents folded, case folded, hyphens -> spaces, apostrophes/dots dropped,
+#   market suffixes (" To Commit") removed
+# and resolved to a small integer through an alias table; the arbitrage joins
+# run on those ints. The table (normalized spelling -> ID) persists between
+# runs so IDs stay stable and hand-added aliases are kept.
+#
+# A spelling not in the table is fuzzy-matched against the known ones before it
+# gets a new ID ("J. Mateta" / "Jean-Philippe Mateta", "Son Heung-min" /
+# "Heung-Min Son"). Candidates come from a trigram and name-token index, so each
+# new spelling is scored against a handful of names, never the whole table.
+# A name that only drops tokens ("Gabriel" / "Gabriel Jesus", "James Ward" /
+# "James Ward-Prowse") is never merged: that is how two different players look.
+# Nor is one whose surname differs ("Lewis Cook" / "Lewis Cooke"): only the other
+# tokens may be spelled differently ("Mohammed Salah" / "Mohamed Salah").
+# A fuzzy match holds for the current run only; it is not written to the alias
+# table, so a wrong merge cannot outlive the run (add_alias() records one for good).
+#
+#   ARB_PLAYER_ALIASES   alias table path (default: player_aliases.json next to this file)
+#   ARB_FUZZY_NAMES=0    exact (normalized) matching only
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+ALIAS_PATH = os.environ.get("ARB_PLAYER_ALIASES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "player_aliases.json"))
+
+FUZZY_MATCHING = os.environ.get("ARB_FUZZY_NAMES", "1") != "0"
+FUZZY_THRESHOLD = 0.75   # minimum similarity to merge two spellings
+FUZZY_MARGIN = 0.05      # best candidate must beat the runner-up by this much
+FUZZY_CANDIDATES = 8     # trigram-ranked candidates scored per new spelling
+
+# Lower-case suffixes some markets append to the player's name
+NAME_SUFFIXES = (" to commit",)
+
+# Letters NFKD does not decompose into base letter + accent
+_FOLD = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "ı": "i"})
+_HYPHEN_RE = re.compile(r"[-‐-―]")
+_DROP_RE = re.compile(r"['‘’`.]")
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize_name(name) -> str:
+    """"Martin Ødegaard " -> "martin odegaard", "J. Ward-Prowse To Commit" -> "j ward prowse"."""
+    text = unicodedata.normalize("NFKD", str(name)).casefold().translate(_FOLD)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _DROP_RE.sub("", _HYPHEN_RE.sub(" ", text))
+    text = _SPACE_RE.sub(" ", text).strip()
+    for suffix in NAME_SUFFIXES:
+        text = text.removesuffix(suffix)
+    return text
+
+def _trigrams(name) -> set:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _initials_match(short, long) -> bool:
+    """
+    `short` abbreviates `long`: it has at least one initial, its surname (last
+    token) is `long`'s, and every other token is a token of `long` or the
+    initial of a different one.
+    """
+    if not any(len(t) == 1 for t in short) or len(short[-1]) < 2 or short[-1] != long[-1]:
+        return False
+    unused = list(long)
+    for token in short:
+        match = next((t for t in unused if t == token or (len(token) == 1 and t.startswith(token))), None)
+        if match is None:
+            return False
+        unused.remove(match)
+    return True
+
+def _same_surname(ta, tb) -> bool:
+    """Either spelling's surname (last token) is a token of the other, or ends it once spaces are dropped ("mac allister" / "macallister")."""
+    return ta[-1] in tb or tb[-1] in ta or "".join(ta).endswith(tb[-1]) or "".join(tb).endswith(ta[-1])
+
+def name_similarity(a, b) -> float:
+    """
+    Score two normalized spellings in [0, 1]:
+      1.0   same tokens in any order ("son heung min" / "heung min son")
+      0.9   one spelling abbreviates the other ("j mateta" / "jean philippe mateta")
+      0.0   one spelling is the other minus some tokens ("gabriel" / "gabriel jesus"),
+            or neither spelling's surname is a token of the other ("lewis cook" / "lewis cooke")
+      else  Jaccard similarity of their character trigrams
+    """
+    ta, tb = a.split(), b.split()
+    if sorted(ta) == sorted(tb):
+        return 1.0
+    short, long = (ta, tb) if len(ta) <= len(tb) else (tb, ta)
+    if _initials_match(short, long):
+        return 0.9
+    if set(short) < set(long) or not _same_surname(ta, tb):
+        return 0.0
+    ga, gb = _trigrams(a), _trigrams(b)
+    return len(ga & gb) / len(ga | gb)
+
+class PlayerIndex:
+    """Normalized spelling -> integer player ID (0 = no name), persisted as JSON."""
+
+    def __init__(self, path=ALIAS_PATH):
+        self.path = path
+        self._ids = {}   # normalized spelling -> ID (aliases share an ID)
+        self._raw = {}   # raw spelling -> ID, so each distinct string is normalized once
+        self._fuzzy = {}  # normalized spelling -> ID fuzzy-matched this run (never saved)
+        self._by_trigram = {}  # trigram -> normalized spellings containing it
+        self._by_token = {}    # name token (2+ letters) -> normalized spellings
+        self._next = 1
+        self._dirty = False
+        self._lock = threading.RLock()  # new spellings may arrive from several pipeline threads
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._ids = {name: int(pid) for name, pid in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable player alias table {self.path}: {e}", file=sys.stderr)
+            return
+        self._raw.clear()
+        self._fuzzy.clear()
+        self._by_trigram.clear()
+        self._by_token.clear()
+        for name in self._ids:
+            self._index(name)
+        self._next = max(self._ids.values(), default=0) + 1
+
+    def _index(self, name):
+        for gram in _trigrams(name):
+            self._by_trigram.setdefault(gram, set()).add(name)
+        for token in name.split():
+            if len(token) > 1:
+                self._by_token.setdefault(token, set()).add(name)
+
+    def _add(self, name, pid):
+        self._ids[name] = pid
+        self._index(name)
+        self._dirty = True
+
+    def fuzzy_match(self, norm) -> int:
+        """ID of the one known spelling confidently similar to `norm`, else 0."""
+        shared = Counter()
+        for gram in _trigrams(norm):
+            shared.update(self._by_trigram.get(gram, ()))
+        candidates = {name for name, _ in shared.most_common(FUZZY_CANDIDATES)}
+        for token in norm.split():
+            candidates |= self._by_token.get(token, set())
+
+        best = {}  # ID -> best score among its spellings
+        for name in candidates:
+            pid = self._ids[name]
+            best[pid] = max(best.get(pid, 0.0), name_similarity(norm, name))
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < FUZZY_THRESHOLD:
+            return 0
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < FUZZY_MARGIN:
+            return 0  # e.g. "j mateta" against two different J. Matetas
+        return ranked[0][0]
+
+    def save(self):
+        """Write the table if new names or aliases were added since the last save."""
+        if not self._dirty or not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._ids, f, ensure_ascii=False, indent=0, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Could not write player alias table {self.path}: {e}", file=sys.stderr)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def resolve(self, name) -> int:
+        pid = self._raw.get(name)
+        if pid is None:
+            with self._lock:
+                norm = normalize_name(name) if isinstance(name, str) else ""
+                pid = self._ids.get(norm, 0) or self._fuzzy.get(norm, 0)
+                if not pid and norm:
+                    pid = self.fuzzy_match(norm) if FUZZY_MATCHING else 0
+                    if pid:
+                        self._fuzzy[norm] = pid
+                    else:
+                        pid = self._next
+                        self._next += 1
+                        self._add(norm, pid)
+                self._raw[name] = pid
+        return pid
+
+    def ids(self, names) -> np.ndarray:
+        """Column of raw names -> int32 player IDs."""
+        return np.fromiter((self.resolve(n) for n in names), dtype=np.int32, count=len(names))
+
+    def add_alias(self, alias, canonical):
+        """Make `alias` resolve to `canonical`'s ID (e.g. "Son Heung-min" -> "Heung-Min Son")."""
+        pid = self.resolve(canonical)
+        norm = normalize_name(alias)
+        if not pid or not norm:
+            return
+        old = self._ids.get(norm)
+        self._add(norm, pid)
+        if old and old != pid:
+            # Spellings that were already merged into the alias follow it
+            for name, other in self._ids.items():
+                if other == old:
+                    self._ids[name] = pid
+        self._raw.clear()
+        self._fuzzy.clear()
+        self.save()
+
+PLAYERS = PlayerIndex()
+
+def player_id(name) -> int:
+    return PLAYERS.resolve(name)
+
+def player_ids(names) -> np.ndarray:
+    return PLAYERS.ids(names)
+
+def add_alias(alias, canonical):
+    PLAYERS.add_alias(alias, canonical)
+
+def save_players():
+    PLAYERS.save()
@@ -0,0 +1,81 @@
+# quick_scan.py
+#
+# Minimal-startup scan of the saved pages in combined_all_bet365's CONFIG.
+#   python quick_scan.py [opportunities.csv]
+# Cards are read straight into Quote records (the per-card extractors of
+# incremental.py) and paired by arb_engine.scan_quotes, so no DataFrame is
+# built and pandas is never imported. Same opportunities as
+# combined_all_bet365 with best_price=False. pandas is loaded only when the
+# results are exported to CSV.
+
+import os
+import sys
+
+from arb_engine import OPPORTUNITY_COLUMNS, scan_quotes
+from combined_all_bet365 import (
+    bet365_file_path, betway_file_path, skybet_file_path, williamhill_file_path, print_opportunity,
+)
+from html_backend import load_soup
+from incremental import CARD_ADAPTERS
+from lazy import lazy_module
+from opportunity_stream import LOG
+from players import save_players
+
+pd = lazy_module("pandas")  # only the CSV export needs it
+
+# =========================================================
+# 1) PIPELINE
+# =========================================================
+
+def page_quotes(bookmaker, path) -> list:
+    """Every Quote on one saved page (repeated card keys: first card wins)."""
+    parse_only, iter_cards, extract = CARD_ADAPTERS[bookmaker]
+    soup = load_soup(path, parse_only=parse_only)
+    seen = set()
+    quotes = []
+    for key, card in iter_cards(soup):
+        if key in seen:
+            continue
+        seen.add(key)
+        quotes.extend(extract(key, card))
+    return quotes
+
+def quick_scan(paths: dict, stake=100) -> list:
+    """
+    paths maps a CARD_ADAPTERS name (Bet365 included) to its saved HTML path.
+    Returns opportunity dicts ranked by ROI.
+    """
+    quotes = []
+    for name, path in paths.items():
+        if not path or not os.path.exists(path):
+            print(f"Skipping {name}: no saved page at {path}", file=LOG)
+            continue
+        quotes.extend(page_quotes(name, path))
+
+    opportunities = scan_quotes(quotes, stake)
+    opportunities.sort(key=lambda opp: opp["ROI"], reverse=True)
+    save_players()  # keep player IDs stable for the next run
+    return opportunities
+
+def export_csv(opportunities, csv_path):
+    pd.DataFrame(opportunities, columns=OPPORTUNITY_COLUMNS).to_csv(csv_path, index=False)
+
+# =========================================================
+# 2) RUN
+# =========================================================
+
+if __name__ == "__main__":
+    opportunities = quick_scan({
+        "Bet365": bet365_file_path,
+        "Betway": betway_file_path,
+        "SkyBet": skybet_file_path,
+        "William Hill": williamhill_file_path,
+    })
+
+    if not opportunities:
+        print("No arbitrage opportunities found.")
+    for opp in opportunities:
+        print_opportunity(opp)
+
+    if len(sys.argv) > 1:
+        export_csv(opportunities, sys.argv[1])
@@ -0,0 +1,152 @@
+# scrape_cache.py
+#
+# On-disk cache of extracted market tables.
+#   key   = hash(page bytes) + scraper name + parser version
+#   value = the scraper's dict of DataFrames, pickled (fast binary, no extra deps)
+# The parser version is a hash of the source of the scraper's module and of
+# every module of this folder it imports, directly or not (markets.py titles,
+# odds.py, html_backend.py ...), so editing any of them invalidates its entries.
+# Entries are evicted least-recently-used first once the cache grows past
+# CACHE_MAX_BYTES (a hit refreshes the entry's mtime).
+#
+#   ARB_CACHE_DIR     where entries live (default: .scrape_cache next to this file)
+#   ARB_CACHE_MAX_MB  size bound in MB (default 256)
+#   ARB_CACHE=0       bypass the cache entirely
+
+import ast
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+
+CACHE_DIR = os.environ.get("ARB_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".scrape_cache"))
+CACHE_MAX_BYTES = int(float(os.environ.get("ARB_CACHE_MAX_MB", "256")) * 1024 * 1024)
+CACHE_ENABLED = os.environ.get("ARB_CACHE", "1") != "0"
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_ENTRY_SUFFIX = ".pkl"
+_parser_versions = {}
+
+def file_digest(file_path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _imported_names(source) -> set:
+    """Top-level module names a source file imports (absolute imports only)."""
+    names = set()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return names
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return names
+
+def _module_sources(module_name) -> list:
+    """Sources of the module and of every local module it imports, transitively, in a stable order."""
+    try:
+        root = inspect.getsource(sys.modules[module_name])
+    except (OSError, TypeError, KeyError):
+        return [module_name]
+    sources = [root]
+    seen = set()
+    pending = sorted(_imported_names(root))
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = os.path.join(_HERE, name + ".py")
+        if not os.path.isfile(path):
+            continue  # stdlib / third party
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        sources.append(f"{name}\n{source}")
+        pending.extend(sorted(_imported_names(source) - seen))
+    return sources[:1] + sorted(sources[1:])
+
+def parser_version(scraper) -> str:
+    """Hash of the source of the module defining `scraper` and of the local modules it depends on."""
+    module_name = scraper.__module__
+    if module_name not in _parser_versions:
+        h = hashlib.blake2b(digest_size=8)
+        for source in _module_sources(module_name):
+            h.update(source.encode("utf-8"))
+        _parser_versions[module_name] = h.hexdigest()
+    return _parser_versions[module_name]
+
+def _entry_path(scraper, digest: str) -> str:
+    name = f"{scraper.__module__}.{scraper.__qualname__}"
+    return os.path.join(CACHE_DIR, f"{name}-{parser_version(scraper)}-{digest}{_ENTRY_SUFFIX}")
+
+def cached_scrape(scraper, file_path):
+    """
+    scraper(file_path), reusing the stored tables when the page bytes and the
+    scraper's code are unchanged since the last run.
+    """
+    if not CACHE_ENABLED or not os.path.exists(file_path):
+        return scraper(file_path)
+
+    entry = _entry_path(scraper, file_digest(file_path))
+    try:
+        with open(entry, "rb") as f:
+            tables = pickle.load(f)
+        os.utime(entry)  # mark as recently used
+        return tables
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Ignoring unreadable cache entry {entry}: {e}", file=sys.stderr)
+
+    tables = scraper(file_path)
+    if tables:  # don't pin an empty result from a failed parse
+        _store(entry, tables)
+    return tables
+
+def _store(entry, tables):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+    except OSError as e:
+        print(f"Could not write cache entry {entry}: {e}", file=sys.stderr)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+    evict()
+
+def evict(max_bytes=None):
+    """Delete least-recently-used entries until the cache fits in max_bytes."""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(_ENTRY_SUFFIX):
+            try:
+                st = os.stat(os.path.join(CACHE_DIR, name))
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def clear():
+    evict(max_bytes=0)
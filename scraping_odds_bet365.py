@@ -1,5 +1,6 @@
 import pandas as pd
-from bs4 import BeautifulSoup
+from html_backend import parse_html
+from text_sections import PageText
 import re  # Import the re module for regular expressions
 
 # Define the file path
@@ -22,20 +23,12 @@ def split_text(input_text):
     formatted_text = '\n'.join(line.rstrip() for line in formatted_text.split('\n'))
     return f"\n{formatted_text}\n"
 
-# Function to process a single section
-def process_section(soup, start_phrase, end_phrase):
-    section_start = soup.find(string=start_phrase)
-    section_end = soup.find(string=end_phrase)
-
-    if not (section_start and section_end):
+# Function to process a single section (page: text_sections.PageText, read once for all sections)
+def process_section(page, start_phrase, end_phrase):
+    section_content = page.section(start_phrase, end_phrase)
+    if section_content is None:
         return None
-
-    # Extract section content
-    section_content = []
-    for sibling in section_start.find_all_next(string=True):
-        if sibling == section_end:
-            break
-        section_content.append(sibling.strip())
+    section_start = page.find(start_phrase)
 
     full_section_text = clean_text(" ".join(section_content).strip())
 
@@ -79,7 +72,7 @@ def process_section(soup, start_phrase, end_phrase):
 # Main script
 try:
     with open(file_path, 'r', encoding='utf-8') as html_file:
-        soup = BeautifulSoup(html_file, 'html.parser')
+        soup = parse_html(html_file)
 
         # Define sections
         sections = [
@@ -89,10 +82,13 @@ try:
             ("Player Tackles", "Player Passes"),
         ]
 
+        # Read the page's strings once; every section is a slice of them
+        page = PageText(soup, [phrase for section in sections for phrase in section])
+
         # Process each section
         dataframes = {}
         for start_phrase, end_phrase in sections:
-            df = process_section(soup, start_phrase, end_phrase)
+            df = process_section(page, start_phrase, end_phrase)
             if df is not None:
                 dataframes[start_phrase] = df
 
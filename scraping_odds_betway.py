@@ -1,4 +1,4 @@
-from bs4 import BeautifulSoup
+from html_backend import parse_html
 import pandas as pd
 
 # Path to the local HTML file
@@ -8,8 +8,8 @@ html_file_path = r"C:\Users\zakaa\Downloads\Brentford - Arsenal Betting Odds, Fo
 with open(html_file_path, "r", encoding="utf-8") as file:
     html_content = file.read()
 
-# Parse the HTML content using BeautifulSoup
-soup = BeautifulSoup(html_content, "html.parser")
+# Parse the HTML content (backend chosen in html_backend.py)
+soup = parse_html(html_content)
 
 # Extract all visible text
 all_text = soup.get_text(separator="\n", strip=True)
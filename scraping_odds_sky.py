@@ -1,7 +1,8 @@
 import pandas as pd
 import re
-from bs4 import BeautifulSoup
+from html_backend import parse_html
 from tabulate import tabulate
+from text_sections import PageText, combine_patterns
 
 # Define the input file path
 input_file_path = r"C:\Users\zakaa\Downloads\Manchester City v Everton Betting & Odds » Sky Bet.html"  # Input HTML file path
@@ -27,11 +28,15 @@ unwanted_text_patterns = [
     r"icon-arrow-up\s*"  # Added this pattern to remove 'icon-arrow-up' with flexible spacing
 ]
 
+# All of the above as one alternation: one pass over the text instead of one per pattern
+unwanted_text_re = combine_patterns(unwanted_text_patterns)
+
+# Player name, "N+ ..." action, fractional odds
+row_re = re.compile(r"([A-Za-z\s\-]+?)\s(\d+\+.*?)(\d+/\d+)")
+
 # Function to clean unwanted text using regular expressions
 def clean_text(content):
-    for pattern in unwanted_text_patterns:
-        content = re.sub(pattern, '', content)
-    return content.strip()
+    return unwanted_text_re.sub('', content).strip()
 
 # Function to get the adjusted combined section name
 def get_combined_section_name(start_phrase):
@@ -41,22 +46,17 @@ def get_combined_section_name(start_phrase):
 try:
     # Open and parse the HTML file
     with open(input_file_path, 'r', encoding='utf-8') as html_file:
-        soup = BeautifulSoup(html_file, 'html.parser')
+        soup = parse_html(html_file)
+
+        # Read the page's strings once; every section is a slice of them
+        page = PageText(soup, [phrase for section in sections for phrase in section])
 
         # Function to extract text between start and end phrases
         def extract_section_text(start_phrase, end_phrase):
-            section_start = soup.find(string=start_phrase)
-            section_end = soup.find(string=end_phrase)
-
-            if section_start and section_end:
-                section_content = []
-                for sibling in section_start.find_all_next(string=True):
-                    if sibling == section_end:
-                        break
-                    section_content.append(sibling.strip())
-                return " ".join(section_content).strip()
-            else:
+            section_content = page.section(start_phrase, end_phrase)
+            if section_content is None:
                 return None
+            return " ".join(section_content).strip()
 
         # Prepare text for output
         combined_section_texts = []
@@ -84,8 +84,7 @@ try:
 
             # Now, process each section into a DataFrame
             # Use regex to parse the data for each section
-            pattern = r"([A-Za-z\s\-]+?)\s(\d+\+.*?)(\d+/\d+)"
-            matches = re.findall(pattern, combined_text)
+            matches = row_re.findall(combined_text)
 
             # Convert to tabular format
             section_data = [[match[0].strip(), match[1].strip(), match[2].strip()] for match in matches]
@@ -0,0 +1,35 @@
+# snapshot_names.py
+#
+# File names of saved bookmaker pages: <fixture><bookmaker>.html, e.g.
+#   whubre365.html  whubrebw.html  whubresky.html  whubrewh.html
+#   arsenal_v_chelsea_bet365.html  arsenal_v_chelsea_skybet.html ...
+# Shared by batch_scan.py, watch.py, pipeline.py and opportunity_stream.py,
+# which all group pages by fixture. Only the standard library is imported, so
+# any module can use it without pulling in the scrapers.
+
+import re
+
+# file-name bookmaker tag -> bookmaker name
+BOOKMAKER_TAGS = {
+    "bet365": "Bet365",
+    "365": "Bet365",
+    "betway": "Betway",
+    "bw": "Betway",
+    "skybet": "SkyBet",
+    "sky": "SkyBet",
+    "williamhill": "William Hill",
+    "wh": "William Hill",
+}
+
+# Shortest fixture prefix wins, so "whubrebet365" is (whubre, bet365), not (whubrebet, 365)
+SNAPSHOT_RE = re.compile(
+    r"^(?P<fixture>.+?)[_\- ]?(?P<tag>" + "|".join(sorted(BOOKMAKER_TAGS, key=len, reverse=True)) + r")\.html?$",
+    re.I,
+)
+
+def parse_snapshot_name(name):
+    """(fixture, bookmaker) for a saved page's file name ("whubre365.html" -> ("whubre", "Bet365")), or None."""
+    m = SNAPSHOT_RE.match(name)
+    if not m:
+        return None
+    return m.group("fixture"), BOOKMAKER_TAGS[m.group("tag").lower()]
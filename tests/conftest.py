@@ -0,0 +1,16 @@
+# The modules are flat scripts at the repository root
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("ARB_PLAYER_ALIASES", "")  # never touch the real alias table
+os.environ.setdefault("ARB_CACHE", "0")
+
+def fixture_pages(prefix="derby"):
+    """{bookmaker: path} of the committed sample pages for one fixture."""
+    tags = {"Bet365": "365", "Betway": "bw", "SkyBet": "sky", "William Hill": "wh"}
+    return {book: os.path.join(FIXTURES, f"{prefix}{tag}.html") for book, tag in tags.items()}
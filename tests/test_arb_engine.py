@@ -0,0 +1,58 @@
+from fractions import Fraction
+
+import pytest
+
+from combined_all_bet365 import run_all
+from conftest import fixture_pages
+
+def _exact(under, over, stake=100):
+    """(ROI %, Under stake) from the fractions, independently of odds.py."""
+    (a, b), (c, d) = (map(int, under.split("/")), map(int, over.split("/")))
+    q = d * (a + b) + b * (c + d)
+    return float(Fraction(a * c - b * d, q) * 100), float(Fraction(stake * b * (c + d), q))
+
+# (player, market, Under odds, Over bookmaker, Over odds) on the derby pages
+EXPECTED = [
+    ("Bukayo Saka", "Shots On Target", "6/4", "SkyBet", "1/1"),
+    ("Bukayo Saka", "Shots On Target", "6/4", "William Hill", "5/6"),
+    ("Bukayo Saka", "Shots On Target", "6/4", "Betway", "4/5"),
+    ("Declan Rice", "Total Shots", "1/4", "Betway", "5/1"),
+    ("Kai Havertz", "Shots On Target", "11/10", "Betway", "11/12"),  # a·c − b·d = 1
+]
+
+# What the per-bookmaker iterrows scans printed for the same pages:
+# (player, Over bookmaker) -> (ROI, bet365 stake, other stake), to the penny
+ITERROWS_OUTPUT = {
+    ("Bukayo Saka", "Betway"): (4.65, 41.86, 58.14),
+    ("Kai Havertz", "Betway"): (0.21, 47.72, 52.28),
+    ("Declan Rice", "Betway"): (3.45, 82.76, 17.24),
+    ("Bukayo Saka", "SkyBet"): (11.11, 44.44, 55.56),
+}
+
+@pytest.fixture(scope="module")
+def opportunities():
+    pages = fixture_pages()
+    _, _, df = run_all(pages.pop("Bet365"), pages, use_cache=False)
+    return df
+
+def test_counts_and_ranking(opportunities):
+    assert len(opportunities) == len(EXPECTED)
+    assert list(opportunities["ROI"]) == sorted(opportunities["ROI"], reverse=True)
+    found = list(zip(opportunities["Player"], opportunities["Market"], opportunities["Under Odds"],
+                     opportunities["Over Bookmaker"], opportunities["Over Odds"]))
+    assert found == EXPECTED
+
+def test_roi_and_stakes_are_exact(opportunities):
+    for opp in opportunities.to_dict("records"):
+        roi, under_stake = _exact(opp["Under Odds"], opp["Over Odds"])
+        assert opp["ROI"] == pytest.approx(roi, abs=1e-9)
+        assert opp["Under Stake"] == pytest.approx(under_stake, abs=1e-9)
+        assert opp["Under Stake"] + opp["Over Stake"] == pytest.approx(100)
+        assert opp["Total Profit"] == pytest.approx(roi)  # £100 stake
+
+def test_matches_the_iterrows_scans(opportunities):
+    for opp in opportunities.to_dict("records"):
+        key = (opp["Player"], opp["Over Bookmaker"])
+        if key in ITERROWS_OUTPUT:
+            assert (round(opp["ROI"], 2), round(opp["Under Stake"], 2), round(opp["Over Stake"], 2)) == ITERROWS_OUTPUT[key]
+    assert sum(opportunities["Over Bookmaker"].isin(["Betway", "SkyBet"])) == len(ITERROWS_OUTPUT)
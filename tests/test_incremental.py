@@ -0,0 +1,76 @@
+import os
+import shutil
+
+import pytest
+
+from combined_all_bet365 import run_all
+from conftest import fixture_pages
+from incremental import CardSnapshot, IncrementalScanner, opportunity_pair
+
+def _key(opp):
+    return (opp["Player"], opp["Market"], opp["Over Bookmaker"], opp["Over Odds"], opp["Under Odds"], round(opp["ROI"], 9))
+
+def _full_scan(pages):
+    others = dict(pages)
+    _, _, df = run_all(others.pop("Bet365"), others, use_cache=False)
+    return df.to_dict("records")
+
+def _edit(path, old, new):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert old in text
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace(old, new))
+
+@pytest.fixture
+def pages(tmp_path):
+    copies = {}
+    for book, path in fixture_pages().items():
+        copies[book] = str(tmp_path / os.path.basename(path))
+        shutil.copy(path, copies[book])
+    return copies
+
+@pytest.fixture
+def state(pages):
+    snapshots = {book: CardSnapshot(book) for book in pages}
+    scanner = IncrementalScanner()
+    for book, path in pages.items():
+        scanner.apply(snapshots[book].rescan(path))
+    return snapshots, scanner
+
+def test_initial_load_matches_a_full_scan(pages, state):
+    _, scanner = state
+    assert sorted(map(_key, scanner.opportunities().to_dict("records"))) == sorted(map(_key, _full_scan(pages)))
+
+def test_unchanged_page_is_an_empty_delta(pages, state):
+    snapshots, scanner = state
+    delta = snapshots["Betway"].rescan(pages["Betway"])
+    assert not delta and delta.cards_changed == 0
+    assert scanner.apply(delta) == []
+
+def test_delta_matches_a_full_rescan(pages, state):
+    snapshots, scanner = state
+    # Sky: Saka 1+ shortens out of the arbitrage, Havertz 1+ drifts into one
+    _edit(pages["SkyBet"], "Bukayo Saka</span><button><span class=\"x3-label\">1/1", "Bukayo Saka</span><button><span class=\"x3-label\">1/2")
+    _edit(pages["SkyBet"], "Kai Havertz</span><button><span class=\"x3-label\">4/5", "Kai Havertz</span><button><span class=\"x3-label\">6/5")
+    delta = snapshots["SkyBet"].rescan(pages["SkyBet"])
+    # Sky cards are runner lines: the two edited rows, not Declan Rice's
+    assert (len(delta.added), len(delta.removed), delta.cards_changed, delta.cards_total) == (2, 2, 2, 3)
+    fresh = scanner.apply(delta)
+
+    full = _full_scan(pages)
+    assert sorted(map(_key, scanner.opportunities().to_dict("records"))) == sorted(map(_key, full))
+    touched = [opp for opp in full if opportunity_pair(opp) in scanner.affected]
+    assert sorted(map(_key, fresh)) == sorted(map(_key, touched))
+    sky = {(opp["Player"], opp["Over Odds"]) for opp in full if opp["Over Bookmaker"] == "SkyBet"}
+    assert sky == {("Kai Havertz", "6/5")}
+
+    # Betway: only the shots section changes, so only its card is re-extracted
+    _edit(pages["Betway"], 'data-outcomename="Declan Rice 5/1"><span data-testid="outcome-price-value">5/1',
+          'data-outcomename="Declan Rice 3/1"><span data-testid="outcome-price-value">3/1')
+    delta = snapshots["Betway"].rescan(pages["Betway"])
+    assert (delta.cards_changed, delta.cards_total) == (1, 2)
+    scanner.apply(delta)
+    full = _full_scan(pages)
+    assert sorted(map(_key, scanner.opportunities().to_dict("records"))) == sorted(map(_key, full))
+    assert "Declan Rice" not in {opp["Player"] for opp in full}
@@ -0,0 +1,57 @@
+from fractions import Fraction
+
+import pytest
+
+from combined_all_bet365 import run_all
+from conftest import fixture_pages
+from odds import arbitrage_stakes, calculate_arbitrage_roi, is_arbitrage, parse_fraction, price_id
+
+def test_parse_fraction():
+    assert parse_fraction("Under 0.5 4/6") == (4, 6)
+    assert parse_fraction("EVS") == (1, 1)
+    assert parse_fraction("Over 1.5") is None
+    assert parse_fraction("5/0") is None
+
+def test_prices_share_ladder_ids():
+    assert price_id("EVS") == price_id("1/1") == price_id(" 1/1 ")
+    assert price_id("8/4") == price_id("2/1")
+    assert price_id("suspended") == 0
+
+@pytest.mark.parametrize("under, over, expected", [
+    ((11, 10), (11, 12), True),   # a·c − b·d = 1: the smallest possible edge
+    ((11, 10), (10, 11), False),  # a·c = b·d: no edge
+    ((1, 9), (9, 1), False),      # a tie that 1/decimal + 1/decimal < 1 calls an arbitrage
+    ((6, 4), (4, 5), True),
+    ((1, 5), (1, 3), False),
+])
+def test_exact_arbitrage_test(under, over, expected):
+    assert bool(is_arbitrage(*under, *over)) is expected
+
+def test_float_decimals_misjudge_the_tie():
+    assert 1 / (1 + 1 / 9) + 1 / (1 + 9 / 1) < 1  # why the test is done on integers
+
+def test_stakes_are_exact_fractions():
+    a, b, c, d = 11, 10, 11, 12
+    roi, under_stake, over_stake, profit = arbitrage_stakes(a, b, c, d, 100)
+    q = d * (a + b) + b * (c + d)
+    assert q == 482
+    assert float(under_stake) == float(Fraction(100 * b * (c + d), q))
+    assert float(roi) == float(Fraction(100 * (a * c - b * d), q))
+    assert float(under_stake + over_stake) == 100
+    # Both outcomes return the same amount
+    assert float(under_stake * (a + b) / b) == pytest.approx(float(over_stake * (c + d) / d))
+    assert float(profit) == pytest.approx(float(roi))
+
+def test_scalar_helper():
+    roi, stake1, stake2, profit = calculate_arbitrage_roi(100, "6/4", "4/5")
+    assert (round(roi, 6), round(stake1, 6), round(stake2, 6)) == (4.651163, 41.860465, 58.139535)
+    assert calculate_arbitrage_roi(100, "6/4", "N/A") == (None, None, None, None)
+
+def test_near_boundary_prices_on_the_pages():
+    pages = fixture_pages()
+    _, _, df = run_all(pages.pop("Bet365"), pages, use_cache=False)
+    havertz = df[df["Player"] == "Kai Havertz"]
+    # Under 11/10 vs Betway 11/12 is kept; vs William Hill 10/11 (tie) and
+    # Under EVS vs Betway 2+ at 1/1 (tie) are not
+    assert list(zip(havertz["Over Bookmaker"], havertz["Over Odds"])) == [("Betway", "11/12")]
+    assert havertz["ROI"].iloc[0] == pytest.approx(100 / 482)
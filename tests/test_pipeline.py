@@ -0,0 +1,9 @@
+from pipeline import local_path
+
+def test_file_urls_become_paths(tmp_path):
+    page = tmp_path / "whubre 365.html"
+    assert local_path(page.as_uri()) == str(page)
+
+def test_paths_pass_and_live_urls_do_not():
+    assert local_path("saved/whubrebw.html") == "saved/whubrebw.html"
+    assert local_path("https://sports.williamhill.com/betting/en-gb/football") is None
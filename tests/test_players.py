@@ -0,0 +1,61 @@
+import pytest
+
+from players import PlayerIndex, name_similarity, normalize_name
+
+@pytest.mark.parametrize("a, b", [
+    ("Gabriel", "Gabriel Jesus"),
+    ("Gabriel", "Gabriel Martinelli"),
+    ("Gabriel Jesus", "Gabriel Martinelli"),
+    ("James Ward", "James Ward-Prowse"),
+    ("Emerson", "Emerson Royal"),
+    ("G. Jesus", "Gabriel Martinelli"),
+    ("Lewis Cook", "Lewis Cooke"),
+])
+def test_different_players_get_different_ids(a, b):
+    index = PlayerIndex(path=None)
+    assert index.resolve(a) != index.resolve(b)
+    assert index.resolve(b) != index.resolve(a)
+
+@pytest.mark.parametrize("a, b", [
+    ("Jean-Philippe Mateta", "J. Mateta"),
+    ("Gabriel Jesus", "G. Jesus"),
+    ("Heung-Min Son", "Son Heung-min"),
+    ("Martin Ødegaard", "Martin Odegaard"),
+    ("James Ward-Prowse", "James Ward Prowse"),
+    ("Bruno Guimarães", "Bruno Guimaraes To Commit"),
+    ("Mohammed Salah", "Mohamed Salah"),
+    ("Alexis Mac Allister", "Alexis MacAllister"),
+])
+def test_spellings_of_one_player_share_an_id(a, b):
+    index = PlayerIndex(path=None)
+    assert index.resolve(a) == index.resolve(b)
+
+def test_subset_names_never_score():
+    assert name_similarity(normalize_name("Gabriel"), normalize_name("Gabriel Jesus")) == 0.0
+    assert name_similarity(normalize_name("James Ward"), normalize_name("James Ward-Prowse")) == 0.0
+
+def test_fuzzy_match_needs_the_same_surname():
+    assert name_similarity("lewis cook", "lewis cooke") == 0.0
+    assert name_similarity("mohammed salah", "mohamed salah") >= 0.75
+
+def test_abbreviation_needs_the_same_surname():
+    assert name_similarity("j mateta", "jean philippe mateta") == 0.9
+    assert name_similarity("j philippe", "jean philippe mateta") < 0.75
+
+def test_fuzzy_matches_are_not_saved(tmp_path):
+    path = str(tmp_path / "aliases.json")
+    index = PlayerIndex(path=path)
+    pid = index.resolve("Jean-Philippe Mateta")
+    assert index.resolve("J. Mateta") == pid
+    index.save()
+
+    reloaded = PlayerIndex(path=path)
+    assert "j mateta" not in reloaded._ids
+    assert reloaded.resolve("Jean-Philippe Mateta") == pid
+    assert reloaded.resolve("J. Mateta") == pid
+
+def test_add_alias_is_saved(tmp_path):
+    path = str(tmp_path / "aliases.json")
+    index = PlayerIndex(path=path)
+    index.add_alias("Gabriel", "Gabriel Jesus")
+    assert PlayerIndex(path=path).resolve("Gabriel") == index.resolve("Gabriel Jesus")
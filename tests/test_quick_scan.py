@@ -0,0 +1,42 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+from combined_all_bet365 import run_all
+from conftest import ROOT, fixture_pages
+from quick_scan import export_csv, quick_scan
+
+def _key(opp):
+    return (opp["Player"], opp["Market"], opp["Over Bookmaker"], opp["Over Odds"], opp["Under Odds"],
+            round(opp["ROI"], 9), round(opp["Under Stake"], 9))
+
+def test_same_opportunities_as_run_all():
+    pages = fixture_pages()
+    found = quick_scan(pages)
+    others = dict(pages)
+    _, _, df = run_all(others.pop("Bet365"), others, use_cache=False)
+    assert len(found) == 5
+    assert sorted(map(_key, found)) == sorted(map(_key, df.to_dict("records")))
+    assert [opp["ROI"] for opp in found] == sorted((opp["ROI"] for opp in found), reverse=True)
+
+def test_never_imports_pandas():
+    script = (
+        "import json, sys\n"
+        f"sys.path[:0] = [{ROOT!r}, {os.path.join(ROOT, 'tests')!r}]\n"
+        "from conftest import fixture_pages\n"
+        "from quick_scan import quick_scan\n"
+        "found = quick_scan(fixture_pages())\n"
+        "print(json.dumps([len(found), 'pandas' in sys.modules]))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert json.loads(out.splitlines()[-1]) == [5, False]
+
+def test_export_csv(tmp_path):
+    path = tmp_path / "opportunities.csv"
+    export_csv(quick_scan(fixture_pages()), path)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 5
+    assert rows[0]["Over Bookmaker"] == "SkyBet"
@@ -0,0 +1,34 @@
+import importlib
+import sys
+
+import scrape_cache
+
+def _version(monkeypatch, tmp_path):
+    monkeypatch.setattr(scrape_cache, "_HERE", str(tmp_path))
+    monkeypatch.setattr(scrape_cache, "_parser_versions", {})
+    return scrape_cache.parser_version(sys.modules["cache_scraper"].scrape)
+
+def test_editing_an_imported_module_changes_the_version(tmp_path, monkeypatch):
+    (tmp_path / "cache_scraper.py").write_text("from cache_titles import TITLE\n\ndef scrape(path):\n    return {TITLE: path}\n")
+    (tmp_path / "cache_titles.py").write_text("from cache_odds import LADDER\nTITLE = 'Player Total Shots'\n")
+    (tmp_path / "cache_odds.py").write_text("LADDER = ['1/2']\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importlib.import_module("cache_scraper")
+    try:
+        before = _version(monkeypatch, tmp_path)
+        assert _version(monkeypatch, tmp_path) == before
+
+        (tmp_path / "cache_titles.py").write_text("from cache_odds import LADDER\nTITLE = 'Player Shots'\n")
+        renamed = _version(monkeypatch, tmp_path)
+        assert renamed != before
+
+        (tmp_path / "cache_odds.py").write_text("LADDER = ['1/2', '4/7']\n")
+        assert _version(monkeypatch, tmp_path) != renamed
+    finally:
+        for name in ("cache_scraper", "cache_titles", "cache_odds"):
+            sys.modules.pop(name, None)
+
+def test_scrapers_depend_on_markets_and_odds():
+    import combined_sky_bet365
+    names = {source.split("\n", 1)[0] for source in scrape_cache._module_sources(combined_sky_bet365.__name__)[1:]}
+    assert {"markets", "odds"} <= names
@@ -0,0 +1,20 @@
+import pytest
+
+from opportunity_stream import fixture_name
+from snapshot_names import parse_snapshot_name
+
+@pytest.mark.parametrize("name, parsed", [
+    ("whubre365.html", ("whubre", "Bet365")),
+    ("whubrebet365.html", ("whubre", "Bet365")),
+    ("arsenal_v_chelsea_skybet.htm", ("arsenal_v_chelsea", "SkyBet")),
+    ("derbyWH.html", ("derby", "William Hill")),
+    ("derbybw.html", ("derby", "Betway")),
+    ("notes.txt", None),
+    ("derby.html", None),
+])
+def test_parse_snapshot_name(name, parsed):
+    assert parse_snapshot_name(name) == parsed
+
+def test_fixture_name_of_a_windows_path():
+    assert fixture_name(r"C:\Users\me\Downloads\whubre365.html") == "whubre"
+    assert fixture_name("/tmp/other.html") == "other"
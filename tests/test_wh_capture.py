@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from conftest import FIXTURES
+from selenium.common.exceptions import WebDriverException
+from wh_capture import BrowserPool, capture_page, page_url
+from wh_text import parse_wh_text
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = BrowserPool(size=1)
+    try:
+        with pool.session():
+            pass
+    except WebDriverException as e:
+        pytest.skip(f"no headless Chrome: {e}")
+    yield pool
+    pool.close()
+
+def test_saved_page_is_expanded_once(pool):
+    url = page_url(os.path.join(FIXTURES, "wh_dropdowns.html"))
+    assert url.startswith("file://")
+    with pool.session() as driver:
+        text = capture_page(driver, url)
+
+    sections = parse_wh_text(text)
+    shots = sections["Total Player Shots On Target"]
+    assert list(shots["Player"]) == ["Gabriel Jesus", "Gabriel Jesus", "Kai Havertz"]
+    assert list(shots["Odds"]) == ["7/20", "29/20", "2/5"]
+    assert list(sections["Total Player Tackles"]["K"]) == [2]
+
+def test_pool_reuses_its_session(pool):
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    assert first is second
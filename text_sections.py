@@ -0,0 +1,54 @@
+# text_sections.py
+#
+# One-pass section splitter for the text-based scrapers
+# (scraping_odds_bet365.py, scraping_odds_sky.py).
+# Those scripts cut a page into sections between marker strings
+# ("Player Tackles" ... "Player Passes"). Searching the tree for both markers
+# and then walking every following string, once per section, is quadratic in
+# page size. PageText reads the page's strings once, noting where each marker
+# occurs, and every section is then a slice of that list.
+#
+# combine_patterns() joins a list of boilerplate regexes into one alternation,
+# so cleaning a section is a single re.sub instead of one per pattern.
+
+import re
+from bisect import bisect_right
+
+from bs4 import NavigableString
+
+class PageText:
+    """Every string of a parsed page in document order, with the positions of the given markers."""
+
+    def __init__(self, soup, markers):
+        markers = set(markers)
+        self.strings = []  # string nodes, as find_all_next(string=True) would visit them
+        self._at = {}      # marker text -> positions in self.strings
+        for node in soup.descendants:
+            if not isinstance(node, NavigableString):
+                continue
+            if node in markers:
+                self._at.setdefault(str(node), []).append(len(self.strings))
+            self.strings.append(node)
+
+    def find(self, marker):
+        """First string node equal to `marker` (soup.find(string=marker)), or None."""
+        positions = self._at.get(marker)
+        return self.strings[positions[0]] if positions else None
+
+    def section(self, start_phrase, end_phrase):
+        """
+        Stripped strings after the first `start_phrase` up to the next
+        `end_phrase` (or the end of the page), or None if either marker is
+        missing from the page.
+        """
+        starts, ends = self._at.get(start_phrase), self._at.get(end_phrase)
+        if not starts or not ends:
+            return None
+        first = starts[0]
+        i = bisect_right(ends, first)
+        stop = ends[i] if i < len(ends) else len(self.strings)
+        return [s.strip() for s in self.strings[first + 1:stop]]
+
+def combine_patterns(patterns, flags=0):
+    """One compiled alternation of `patterns`, tried in list order at each position."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
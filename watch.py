@@ -0,0 +1,216 @@
+# watch.py
+#
+# Long-running mode: watch the snapshot directory and rescan the moment a
+# bookmaker page is saved.
+#   python watch.py <directory>
+# Pages are grouped by fixture from their file names (snapshot_names.py)
+# (<fixture><bookmaker>.html, e.g. whubre365.html, whubresky.html).
+# Every fixture keeps a CardSnapshot per bookmaker and one IncrementalScanner
+# (incremental.py), so the other bookmakers' quotes stay parsed in memory: a
+# save re-extracts only the cards that changed in that one file and re-scans
+# only the (player, stat) pairs its delta touches.
+#
+# On Linux the directory is watched with inotify (close-after-write and
+# rename-into events, so a browser's temp-file-then-rename save is seen once
+# it is complete); elsewhere it is polled every POLL_INTERVAL. Either way a
+# file must be quiet for DEBOUNCE_MS before it is read, so a page written in
+# several chunks is parsed once, whole.
+#
+# With the delta stream on (opportunity_stream.py, the default), stdout carries
+# only JSON-line events: the start-up load reports every fixture against the
+# stored state, and each save reports what changed on the pairs it touched.
+# Status lines go to stderr.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from combined_all_bet365 import print_opportunity
+from incremental import CARD_ADAPTERS, CardSnapshot, IncrementalScanner, opportunity_pair
+from opportunity_stream import DELTA_STREAM, LOG, OpportunityStore, emit
+from players import save_players
+from snapshot_names import parse_snapshot_name
+
+DEBOUNCE_MS = 100      # a file must be quiet this long before it is parsed
+POLL_INTERVAL = 0.1    # seconds between directory scans without inotify
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (then len bytes of name)
+
+class InotifyWatcher:
+    """Names of files written (and closed) or renamed into `directory`, via inotify."""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"cannot watch {directory}")
+
+    def changes(self, timeout=None) -> list:
+        """Block up to `timeout` seconds (None: forever) for events; returns the file names."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback without inotify (Windows, macOS): compares every file's (mtime, size) each POLL_INTERVAL."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._seen = self._stat_all()
+
+    def _stat_all(self):
+        seen = {}
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file():
+                    st = entry.stat()
+                    seen[entry.name] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue  # removed while scanning
+        return seen
+
+    def changes(self, timeout=None) -> list:
+        time.sleep(POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL))
+        current = self._stat_all()
+        changed = [name for name, stamp in current.items() if self._seen.get(name) != stamp]
+        self._seen = current
+        return changed
+
+    def close(self):
+        pass
+
+def open_watcher(directory):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling {directory} instead", file=LOG)
+    return PollingWatcher(directory)
+
+class FixtureState:
+    """Parsed cards of every bookmaker page of one fixture, and their opportunities."""
+
+    def __init__(self, stake=100):
+        self.snapshots = {}
+        self.scanner = IncrementalScanner(stake)
+
+    def update(self, book, path):
+        """Re-extract `path`; returns (QuoteDelta, fresh opportunities for the pairs it touched)."""
+        snapshot = self.snapshots.get(book)
+        if snapshot is None:
+            snapshot = self.snapshots[book] = CardSnapshot(book)
+        delta = snapshot.rescan(path)
+        return delta, self.scanner.apply(delta)
+
+class SnapshotWatcher:
+    """Directory watch loop: debounce saves, then rescan the one changed page."""
+
+    def __init__(self, directory, stake=100, debounce_ms=DEBOUNCE_MS):
+        self.directory = directory
+        self.stake = stake
+        self.debounce = debounce_ms / 1000
+        self.fixtures = {}  # fixture -> FixtureState
+        self.store = OpportunityStore() if DELTA_STREAM else None
+
+    def _page(self, name):
+        """(fixture, bookmaker) for a snapshot file name, or None."""
+        parsed = parse_snapshot_name(name)
+        return parsed if parsed and parsed[1] in CARD_ADAPTERS else None
+
+    def load_existing(self):
+        """Parse every page already in the directory, so the first save only rescans its own file."""
+        for name in sorted(os.listdir(self.directory)):
+            if self._page(name):
+                self.handle(name, quiet=True)
+        if self.store is not None:
+            for fixture, state in self.fixtures.items():
+                emit(self.store.update(state.scanner.opportunities().to_dict("records"), fixture))
+            self.store.save()
+
+    def handle(self, name, quiet=False):
+        page = self._page(name)
+        if page is None:
+            return
+        fixture, book = page
+        path = os.path.join(self.directory, name)
+        try:
+            saved_at = os.stat(path).st_mtime
+        except OSError:
+            return  # saved and removed again before we got to it
+        state = self.fixtures.setdefault(fixture, FixtureState(self.stake))
+
+        try:
+            delta, fresh = state.update(book, path)
+        except Exception as e:
+            print(f"Failed to rescan {name}: {e}", file=LOG)
+            return
+        save_players()
+        if quiet:
+            return
+
+        fresh.sort(key=lambda opp: opp["ROI"], reverse=True)
+        if self.store is not None:
+            touched = state.scanner.affected
+            events = self.store.update(fresh, fixture, within=lambda opp: opportunity_pair(opp) in touched)
+            emit(events)
+            self.store.save()
+        latency = (time.time() - saved_at) * 1000
+        print(f"{fixture} {book}: {delta}; {len(fresh)} opportunities on the touched pairs ({latency:.0f} ms after save)",
+              file=LOG)
+        if self.store is None:
+            for opp in fresh:
+                print_opportunity(opp, self.stake)
+
+    def run(self):
+        """Watch until interrupted (Ctrl+C)."""
+        self.load_existing()
+        watcher = open_watcher(self.directory)
+        print(f"Watching {self.directory} ({type(watcher).__name__}); {len(self.fixtures)} fixture(s) loaded", file=LOG)
+        pending = {}  # name -> time it has been quiet long enough
+        try:
+            while True:
+                timeout = max(0.0, min(pending.values()) - time.monotonic()) if pending else None
+                for name in watcher.changes(timeout):
+                    if self._page(name):
+                        pending[name] = time.monotonic() + self.debounce
+                now = time.monotonic()
+                for name in [n for n, due in pending.items() if due <= now]:
+                    del pending[name]
+                    self.handle(name)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python watch.py <directory>")
+    directory = sys.argv[1]
+    if not os.path.isdir(directory):
+        sys.exit(f"No such directory: {directory}")
+    SnapshotWatcher(directory).run()
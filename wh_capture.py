@@ -0,0 +1,269 @@
+# wh_capture.py
+#
+# William Hill capture with warm headless Chrome sessions.
+#   python wh_capture.py <url or saved page> [...]
+# Starting Chrome costs seconds, so BrowserPool keeps a few sessions open and
+# hands them out per capture. A capture never sleeps for a fixed time:
+#   - page load:       wait for document.readyState == "complete"
+#   - market tab:      wait for the first header__toolbar, then for the DOM to settle
+#   - dropdowns:       one script clicks the first toggle of every header__toolbar
+#                      (the others can collapse a section again), then one wait
+#                      for the DOM to settle
+# "Settled" means a MutationObserver saw no change for QUIET_MS (or PAGE_TIMEOUT
+# passed). Saved pages are opened as file:// URLs and skip the market-tab click,
+# since a saved copy is already on that tab and its link points at the live site.
+#
+#   ARB_CHROMEDRIVER   chromedriver path (default: let Selenium find one)
+
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from opportunity_stream import LOG
+from wh_text import parse_wh_text
+
+DRIVER_PATH = os.environ.get("ARB_CHROMEDRIVER")
+
+POOL_SIZE = 2
+PAGE_TIMEOUT = 15          # seconds any single wait may take
+QUIET_MS = 300             # no DOM mutation for this long = settled
+MARKET_COLLECTION_ID = "4" # the player-markets tab
+
+# Click each toolbar's first dropdown toggle in one round trip; returns how many were clicked
+_EXPAND_ALL_JS = """
+let clicked = 0;
+for (const toolbar of document.querySelectorAll(".header__toolbar")) {
+    const button = toolbar.querySelector("a.button-clear");
+    if (button) {
+        button.click();
+        clicked++;
+    }
+}
+return clicked;
+"""
+
+# Async script: resolves true once the DOM has been quiet for quietMs, false at the deadline
+_WAIT_QUIET_JS = """
+const [quietMs, timeoutMs, done] = arguments;
+let timer = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(() => finish(true), quietMs);
+});
+const deadline = setTimeout(() => finish(false), timeoutMs);
+function finish(settled) {
+    observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(deadline);
+    done(settled);
+}
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(() => finish(true), quietMs);
+"""
+
+def chrome_options(headless=True) -> Options:
+    options = Options()
+    if headless:
+        options.add_argument("--headless")  # no browser window
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    return options
+
+def page_url(target) -> str:
+    """URLs pass through; a saved page's path becomes a file:// URL."""
+    if "://" in target:
+        return target
+    return Path(target).resolve().as_uri()
+
+class BrowserPool:
+    """
+    Up to `size` headless Chrome sessions, started on first use and reused by
+    every later capture. A session that raises a WebDriverException is
+    discarded and replaced on the next checkout.
+    """
+
+    def __init__(self, size=POOL_SIZE, driver_path=DRIVER_PATH, headless=True):
+        self.size = size
+        self.driver_path = driver_path
+        self.headless = headless
+        self._idle = queue.LifoQueue()  # most recently used first: its caches are warm
+        self._started = 0
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        service = Service(self.driver_path) if self.driver_path else Service()
+        driver = webdriver.Chrome(service=service, options=chrome_options(self.headless))
+        driver.set_script_timeout(PAGE_TIMEOUT + 5)
+        return driver
+
+    def _checkout(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                start = self._started < self.size
+                if start:
+                    self._started += 1
+            if start:
+                break
+            try:
+                # Every session busy: wait for one to come back (re-checking,
+                # since a discarded session frees a slot instead)
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+        try:
+            driver = self._start()
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._started -= 1
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    @contextmanager
+    def session(self):
+        """Check a warm session out for one capture."""
+        driver = self._checkout()
+        try:
+            yield driver
+        except TimeoutException:
+            self._idle.put(driver)  # slow page, healthy session
+            raise
+        except WebDriverException:
+            self._discard(driver)
+            raise
+        except BaseException:
+            self._idle.put(driver)
+            raise
+        else:
+            self._idle.put(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+            self._started = 0
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+        self._idle = queue.LifoQueue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def wait_ready(driver, timeout=PAGE_TIMEOUT):
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+def wait_quiet(driver, quiet_ms=QUIET_MS, timeout=PAGE_TIMEOUT) -> bool:
+    """Block until the DOM stops changing; False if it was still changing at the timeout."""
+    return bool(driver.execute_async_script(_WAIT_QUIET_JS, quiet_ms, int(timeout * 1000)))
+
+def expand_page(driver, url, open_collection=None, timeout=PAGE_TIMEOUT):
+    """
+    Load `url`, open the player-markets tab (live pages only, unless
+    open_collection says otherwise) and expand every dropdown.
+    """
+    if open_collection is None:
+        open_collection = not url.startswith("file:")
+
+    driver.get(url)
+    wait_ready(driver, timeout)
+
+    if open_collection:
+        links = driver.find_elements(By.CSS_SELECTOR, f"a[data-marketcollectionid='{MARKET_COLLECTION_ID}']")
+        if links:
+            driver.execute_script("arguments[0].click();", links[0])
+            try:
+                WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CLASS_NAME, "header__toolbar")))
+            except TimeoutException:
+                print(f"No market dropdowns on {url} after opening the player tab", file=LOG)
+            wait_quiet(driver, timeout=timeout)
+
+    if driver.execute_script(_EXPAND_ALL_JS):
+        if not wait_quiet(driver, timeout=timeout):
+            print(f"{url} was still changing after {timeout}s; capturing anyway", file=LOG)
+
+def capture_page(driver, url, open_collection=None, timeout=PAGE_TIMEOUT) -> str:
+    """The expanded page's body text (see wh_text.parse_wh_text)."""
+    expand_page(driver, url, open_collection, timeout)
+    return driver.find_element(By.TAG_NAME, "body").text
+
+def load_page(driver, url, timeout=PAGE_TIMEOUT):
+    """Load `url` and wait for it to finish rendering, without clicking anything."""
+    driver.get(url)
+    wait_ready(driver, timeout)
+    wait_quiet(driver, timeout=timeout)
+
+def capture_html(driver, url, open_collection=None, timeout=PAGE_TIMEOUT, expand=True) -> str:
+    """
+    The page's markup, for the HTML scrapers (combined_wh_bet365.scrape_william_hill_html).
+    expand=False just renders the page: the William Hill clicks are for William Hill pages only.
+    """
+    if expand:
+        expand_page(driver, url, open_collection, timeout)
+    else:
+        load_page(driver, url, timeout)
+    return driver.page_source
+
+def capture_many(targets, pool: BrowserPool) -> dict:
+    """{target: body text} for URLs or saved pages, captured concurrently on the pool's sessions."""
+    def capture(target):
+        with pool.session() as driver:
+            return capture_page(driver, page_url(target))
+
+    texts = {}
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        futures = {target: executor.submit(capture, target) for target in targets}
+        for target, future in futures.items():
+            try:
+                texts[target] = future.result()
+            except Exception as e:
+                print(f"Failed to capture {target}: {e}", file=LOG)
+    return texts
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python wh_capture.py <url or saved page> [...]")
+
+    start = time.perf_counter()
+    with BrowserPool(size=min(POOL_SIZE, len(sys.argv) - 1)) as pool:
+        texts = capture_many(sys.argv[1:], pool)
+    print(f"Captured {len(texts)} page(s) in {time.perf_counter() - start:.1f}s")
+
+    for target, text in texts.items():
+        print(f"\n{target}")
+        for name, df in parse_wh_text(text).items():
+            print(f"\n{name}:")
+            print(df)
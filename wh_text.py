@@ -0,0 +1,148 @@
+# wh_text.py
+#
+# Parser for the body text of a William Hill event page with every dropdown
+# expanded (what test_williamhill.py captures with Selenium).
+#   python wh_text.py [text file ...]
+# Defaults to the checked-in samples, which double as benchmark fixtures:
+#   williamhill_expanded_dropdowns_text.txt   raw body text (start/end headers)
+#   final_filtered_text_with_sections.txt     filtered sections (start headers only)
+#
+# The text is read line by line once: every header line's position is recorded
+# in the same scan, and each section is the slice between its start header and
+# the next end header, so nothing is searched twice. Headers are matched as
+# whole lines, the way body.text lays them out ("Total Player Shots" never
+# matches inside "Total Player Shots On Target").
+# Rows are "<player> At Least|Over <n> <what>" followed by a "<a>/<b>" odds
+# line, parsed with precompiled patterns into typed columns.
+
+import os
+import re
+import sys
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+from lazy import lazy_module
+from markets import k_at_least, k_over_count
+from odds import price_ids
+
+pd = lazy_module("pandas")
+
+# (section start header, end header) on the expanded page
+WH_TEXT_SECTIONS = [
+    ("Total Player Shots On Target", "1st Half Player Shots On Target"),
+    ("Total Player Fouls", "Total Player Offsides"),
+    ("Total Player Shots", "Player Shot In Both Halves"),
+    ("Total Player Tackles", "1st Half Player Tackles"),
+]
+
+# Filtered text keeps only the start headers: a section runs to the next one
+WH_FILTERED_SECTIONS = [(start, None) for start, _ in WH_TEXT_SECTIONS]
+
+WH_TEXT_FIXTURES = [
+    "williamhill_expanded_dropdowns_text.txt",
+    "final_filtered_text_with_sections.txt",
+]
+
+WH_TEXT_COLUMNS = ["Player", "Action", "Qualifier", "N", "K", "Odds", "Price"]
+
+_PLAYER_ACTION_RE = re.compile(r"(.+?)(At Least.*|Over.*)")
+_ACTION_RE = re.compile(r"(At Least|Over) (\d+) (.+)")
+_ODDS_RE = re.compile(r"(\d+/\d+)")
+
+_K_OF_QUALIFIER = {"At Least": k_at_least, "Over": k_over_count}
+
+def split_sections(text, header_pairs=WH_TEXT_SECTIONS) -> dict:
+    """
+    {start header: [stripped non-empty lines between the headers]} for every
+    pair whose start header occurs with an end header after it. An end header
+    of None means "up to the next start header, or the end of the text".
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+
+    headers = {h for pair in header_pairs for h in pair if h is not None}
+    at = {}  # header -> line numbers, in one scan
+    for i, line in enumerate(lines):
+        if line in headers:
+            at.setdefault(line, []).append(i)
+    any_start = sorted(i for start, _ in header_pairs for i in at.get(start, ()))
+
+    sections = {}
+    for start, end in header_pairs:
+        if start not in at:
+            continue
+        first = at[start][0]
+        stops = any_start if end is None else at.get(end, [])
+        j = bisect_right(stops, first)
+        if j < len(stops):
+            sections[start] = lines[first + 1:stops[j]]
+        elif end is None:
+            sections[start] = lines[first + 1:]
+    return sections
+
+def parse_rows(lines):
+    """Stream (player, action, qualifier, n, k, odds) from "<player> <action>" / "<odds>" line pairs."""
+    for line, following in zip(lines, lines[1:]):
+        m = _PLAYER_ACTION_RE.match(line)
+        if not m:
+            continue
+        odds = _ODDS_RE.match(following)
+        if not odds:
+            continue
+        player, action = m.group(1).strip(), m.group(2).strip()
+        a = _ACTION_RE.match(action)
+        if a:
+            qualifier, n, what = a.group(1), int(a.group(2)), a.group(3)
+            k = _K_OF_QUALIFIER[qualifier](n)
+            action = f"{k}+ {what}"
+        else:
+            qualifier, n, k = "", 0, 0  # no count: 0 never matches a market
+        yield player, action, qualifier, n, k, odds.group(1)
+
+def parse_section(lines) -> pd.DataFrame:
+    """One section's lines -> Player | Action ("n+ ...") | Qualifier | N | K | Odds | Price (odds ladder ID)."""
+    rows = list(parse_rows(lines))
+    columns = list(zip(*rows)) if rows else [()] * 6
+    odds = list(columns[5])
+    return pd.DataFrame({
+        "Player": list(columns[0]),
+        "Action": list(columns[1]),
+        "Qualifier": list(columns[2]),
+        "N": np.array(columns[3], dtype=np.int16),
+        "K": np.array(columns[4], dtype=np.int16),
+        "Odds": odds,
+        "Price": price_ids(odds),
+    }, columns=WH_TEXT_COLUMNS)
+
+def parse_wh_text(text, header_pairs=None) -> dict:
+    """
+    {section: DataFrame} for the expanded body text or the filtered text
+    (detected by the end headers: the filtered text has none).
+    """
+    if header_pairs is None:
+        sections = split_sections(text, WH_TEXT_SECTIONS)
+        if not sections:
+            sections = split_sections(text, WH_FILTERED_SECTIONS)
+    else:
+        sections = split_sections(text, header_pairs)
+    return {name: parse_section(lines) for name, lines in sections.items()}
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    paths = sys.argv[1:] or [os.path.join(here, name) for name in WH_TEXT_FIXTURES]
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            dataframes = parse_wh_text(text)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        print(f"{os.path.basename(path)}: {sum(len(df) for df in dataframes.values())} rows, best {min(timings):.1f} ms")
+        for name, df in dataframes.items():
+            print(f"\n{name}:")
+            print(df)
+        print("\n" + "=" * 50 + "\n")